@@ -3,12 +3,31 @@ Multi-Domain Agent Processor with LangGraph
 Processes multiple domains using the agent graph with parallel execution
 """
 
+import asyncio
+import json
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import math
+import os
+from functools import partial
+from itertools import islice
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
 import time
+import httpx
 import db_new
-from agent_graph import process_domain
+from agent_graph import (
+    HTTP2_AVAILABLE,
+    OLLAMA_NUM_PARALLEL,
+    OLLAMA_URL,
+    USER_AGENT,
+    LLMBatcher,
+    SaveBatcher,
+    extract_with_llm_async,
+    process_domains_pipelined,
+    save_to_database_async,
+    scrape_website_async,
+    warm_up_model,
+)
 import pandas as pd
 
 logging.basicConfig(
@@ -18,67 +37,194 @@ logging.basicConfig(
 )
 
 
+def canonical_domain(raw: str) -> str:
+    """Lowercase and strip scheme, path, trailing slash and a leading www."""
+    d = str(raw).strip().lower()
+    if "://" in d:
+        d = d.split("://", 1)[1]
+    d = d.split("/", 1)[0]
+    return d.removeprefix("www.")
+
+
+# One constant statement per chunk: json_each unpacks the chunk's domains,
+# and both lookups are index probes (company_information's primary key and
+# idx_contact_information_domain), so memory stays flat however big the DB.
+PROCESSED_QUERY = """
+SELECT domain FROM company_information
+WHERE domain IN (SELECT value FROM json_each(?))
+UNION
+SELECT domain FROM contact_information
+WHERE domain IN (SELECT value FROM json_each(?))
+"""
+
+
+def processed_among(conn, domains: list) -> set:
+    """The subset of domains that already have extracted data in the agent DB."""
+    if not domains:
+        return set()
+    batch = json.dumps(domains)
+    return {row[0] for row in conn.execute(PROCESSED_QUERY, (batch, batch))}
+
+
+def iter_domains(
+    csv_path: str = "Topic1_Input_Records(in).csv",
+    limit: int = None,
+    skip_processed: bool = False,
+) -> Iterator[str]:
+    """Yield unique, canonical domains from the input CSV, reading it in chunks.
+
+    Work can start on the first rows while the rest of the file is still
+    being read, and only the set of seen domains is held in memory. With
+    skip_processed, each chunk is checked against the DB in one query so
+    re-runs only pay for new domains.
+    """
+    conn = db_new.get_conn(read_only=True) if skip_processed else None
+    seen = set()
+    yielded = 0
+    try:
+        for chunk in pd.read_csv(csv_path, usecols=["Domain"], chunksize=1000):
+            fresh = []
+            for raw in chunk["Domain"].dropna():
+                domain = canonical_domain(raw)
+                if domain and domain not in seen:
+                    seen.add(domain)
+                    fresh.append(domain)
+            if conn is not None:
+                done = processed_among(conn, fresh)
+                fresh = [d for d in fresh if d not in done]
+            for domain in fresh:
+                yield domain
+                yielded += 1
+                if limit and yielded >= limit:
+                    return
+    finally:
+        if conn is not None:
+            conn.close()
+
+
 def load_domains(csv_path: str = "Topic1_Input_Records(in).csv", limit: int = None):
     """Load domains from input CSV"""
-    df = pd.read_csv(csv_path)
-    domains = df["Domain"].dropna().unique().tolist()
-
-    if limit:
-        domains = domains[:limit]
+    domains = list(iter_domains(csv_path, limit))
 
     logging.info(f"Loaded {len(domains)} domains from {csv_path}")
     return domains
 
 
-def process_batch(domains: list, max_workers: int = 4):
-    """Process multiple domains in parallel using ThreadPoolExecutor"""
+DEFAULT_MAX_WORKERS = 4
+WARMUP_DOMAINS = 5
+
+
+def _record_result(results: dict, result: dict):
+    if result["status"] == "saved":
+        results["success"] += 1
+    else:
+        results["failed"] += 1
+        results["errors"].append(
+            {
+                "domain": result["domain"],
+                "status": result["status"],
+                "error": result.get("error", "Unknown error"),
+            }
+        )
+
+
+def _autotune_workers(warmup_results: list) -> int:
+    """Size scrape concurrency from observed scrape vs LLM latency.
+
+    Scraping needs to run roughly scrape/llm times wider than the LLM slots
+    to keep Ollama fed; capped at 4x the CPU count.
+    """
+    timings = [r.get("timings", {}) for r in warmup_results]
+    scrape = [t["scrape"] for t in timings if "scrape" in t]
+    llm = [t["extract"] for t in timings if "extract" in t]
+    if not scrape or not llm:
+        return DEFAULT_MAX_WORKERS
+
+    scrape_latency = sum(scrape) / len(scrape)
+    llm_latency = sum(llm) / len(llm)
+    ratio = math.ceil(scrape_latency / max(llm_latency, 1e-3))
+    max_workers = max(1, min((os.cpu_count() or 1) * 4, OLLAMA_NUM_PARALLEL * ratio))
+    logging.info(
+        f"Autotuned max_workers={max_workers} "
+        f"(scrape {scrape_latency:.2f}s, llm {llm_latency:.2f}s)"
+    )
+    return max_workers
+
+
+async def _process_batch_async(domains: Iterable[str], max_workers, results: dict):
+    """Run all domains concurrently on one event loop and shared AsyncClients"""
+    limits = httpx.Limits(max_connections=200)
+    async with httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        timeout=30.0,
+        follow_redirects=True,
+        limits=limits,
+        headers={"User-Agent": USER_AGENT},
+    ) as client, httpx.AsyncClient(
+        base_url=OLLAMA_URL,
+        timeout=300.0,
+        limits=httpx.Limits(max_keepalive_connections=OLLAMA_NUM_PARALLEL),
+    ) as llm_client:
+        batcher = LLMBatcher(llm_client, max_in_flight=OLLAMA_NUM_PARALLEL)
+        saver = SaveBatcher()
+
+        async def run_all(batch: Iterable[str], concurrency: int) -> list:
+            return await process_domains_pipelined(
+                batch,
+                scrape_node=partial(
+                    scrape_website_async,
+                    client=client,
+                    sem=asyncio.Semaphore(concurrency),
+                ),
+                extract_node=partial(extract_with_llm_async, batcher=batcher),
+                save_node=partial(save_to_database_async, batcher=saver),
+                scrape_workers=concurrency,
+                extract_workers=batcher.batch_size,
+                save_workers=saver.batch_size,
+                on_result=partial(_record_result, results),
+            )
+
+        domains = iter(domains)
+        if max_workers is None:
+            warmup = list(islice(domains, WARMUP_DOMAINS))
+            logging.info(f"Warming up on {len(warmup)} domains to size workers")
+            max_workers = _autotune_workers(await run_all(warmup, max(1, len(warmup))))
+
+        await run_all(domains, max_workers * 8)
+
+
+def process_batch(domains: Iterable[str], max_workers: Optional[int] = None):
+    """Process multiple domains through the scrape -> extract -> save pipeline.
+
+    domains may be any iterable (e.g. iter_domains) and is consumed lazily.
+
+    max_workers scales the scrape stage (max_workers * 8 concurrent
+    fetches); when omitted it is autotuned from a small warmup batch. The
+    extract stage groups LLM requests by prompt length and keeps up to
+    OLLAMA_NUM_PARALLEL in flight; the save stage commits in batches.
+    """
     start_time = time.time()
     results = {"success": 0, "failed": 0, "errors": []}
 
     logging.info(
-        f"Starting batch processing of {len(domains)} domains with {max_workers} workers"
+        f"Starting batch processing with "
+        f"{max_workers if max_workers else 'auto'} workers"
     )
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
-        future_to_domain = {
-            executor.submit(process_domain, domain): domain for domain in domains
-        }
-
-        # Process completed tasks
-        for future in as_completed(future_to_domain):
-            domain = future_to_domain[future]
-            try:
-                result = future.result()
-                if result["status"] == "saved":
-                    results["success"] += 1
-                else:
-                    results["failed"] += 1
-                    results["errors"].append(
-                        {
-                            "domain": domain,
-                            "status": result["status"],
-                            "error": result.get("error", "Unknown error"),
-                        }
-                    )
-            except Exception as e:
-                results["failed"] += 1
-                results["errors"].append(
-                    {"domain": domain, "status": "exception", "error": str(e)}
-                )
-                logging.error(f"Exception processing {domain}: {e}")
+    asyncio.run(_process_batch_async(domains, max_workers, results))
 
     elapsed = time.time() - start_time
+    total = results["success"] + results["failed"]
 
     # Print summary
     print("\n" + "=" * 60)
     print("BATCH PROCESSING COMPLETE")
     print("=" * 60)
-    print(f"Total Domains: {len(domains)}")
+    print(f"Total Domains: {total}")
     print(f"Success: {results['success']}")
     print(f"Failed: {results['failed']}")
     print(f"Time Elapsed: {elapsed:.2f}s")
-    print(f"Avg per domain: {elapsed/len(domains):.2f}s")
+    print(f"Avg per domain: {elapsed/max(total, 1):.2f}s")
     print("=" * 60)
 
     if results["errors"]:
@@ -96,6 +242,9 @@ def main():
     # Initialize database
     db_new.init_db()
 
+    # Load the model now so the first domains don't pay the cold-load latency
+    warm_up_model()
+
     # Get parameters
     if len(sys.argv) > 1:
         num_domains = int(sys.argv[1])
@@ -105,10 +254,10 @@ def main():
     if len(sys.argv) > 2:
         max_workers = int(sys.argv[2])
     else:
-        max_workers = 4
+        max_workers = None  # autotune from a warmup batch
 
-    # Load and process
-    domains = load_domains(limit=num_domains)
+    # Stream new domains from the CSV straight into the pipeline
+    domains = iter_domains(limit=num_domains, skip_processed=True)
     results = process_batch(domains, max_workers=max_workers)
 
     # Check database stats
@@ -129,9 +278,11 @@ def main():
         "services",
     ]
 
-    for table in tables:
-        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-        count = cursor.fetchone()[0]
+    # One round-trip for all table counts
+    cursor.execute(
+        " UNION ALL ".join(f"SELECT '{t}', COUNT(*) FROM {t}" for t in tables)
+    )
+    for table, count in cursor.fetchall():
         print(f"{table}: {count} rows")
 
     conn.close()
@@ -3,16 +3,86 @@ LangGraph Agent for Company Intelligence Pipeline
 Orchestrates: Scraping -> LLM Extraction -> Database Storage
 """
 
+import asyncio
 import logging
-from typing import TypedDict, Annotated, Sequence
+import os
+import time
+from typing import TypedDict, Annotated, Sequence, Callable, Iterable
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 import operator
 import httpx
 from bs4 import BeautifulSoup
-import json
+import orjson
 import db_new
-from worker_new import preprocess_text, build_prompt, save_extracted_data
+from worker_new import (
+    PROFILE_SCHEMA,
+    PROMPT_PREFIX,
+    PROMPT_TEMPLATE,
+    preprocess_text,
+    build_prompt,
+    save_extracted_data,
+    save_extracted_batch,
+)
+
+# Lexbor-backed parser for fast text extraction; bs4+lxml remains the fallback
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # pragma: no cover
+    LexborHTMLParser = None
+
+# HTTP/2 (header compression, multiplexed redirects) needs the optional h2 package
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    HTTP2_AVAILABLE = False
+
+STRIP_TAGS = ("script", "style", "noscript", "iframe")
+# Pages are truncated past this size so one huge document can't dominate parse time
+MAX_HTML_BYTES = 2_000_000
+
+OLLAMA_URL = "http://127.0.0.1:11434"
+# Q4_K_M roughly halves bytes per weight vs the default tag; decode on CPU is
+# memory-bandwidth bound so this translates almost directly into tokens/sec
+OLLAMA_MODEL = "llama3.2:3b-instruct-q4_K_M"
+# Keep the model (and its cached prompt prefix) resident for the process lifetime
+OLLAMA_KEEP_ALIVE = -1
+# Should match the server's OLLAMA_NUM_PARALLEL so concurrent generates are
+# merged into shared decode steps instead of queueing
+OLLAMA_NUM_PARALLEL = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+# The filled-in schema rarely exceeds ~1k tokens; capping decode bounds runaway output
+NUM_PREDICT = 1024
+# Fixed for every request: Ollama reloads the runner (dropping the KV cache)
+# whenever num_ctx changes between calls
+NUM_CTX = 4096
+CHARS_PER_TOKEN = 4
+JSON_HEADERS = {"Content-Type": "application/json"}
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+# Pages with less text than this (parked domains, JS-only shells) skip the LLM
+MIN_USEFUL_CHARS = 300
+
+# Page text budget: ~1500 tokens, below preprocess_text's MAX_TEXT_LENGTH cap
+# so it is what actually binds. Dense pages tokenise nearer 3 chars/token, and
+# even then text + prompt + NUM_PREDICT stays inside NUM_CTX
+MAX_TEXT_TOKENS = 1500
+MAX_TEXT_CHARS = MAX_TEXT_TOKENS * CHARS_PER_TOKEN
+
+# Shared, thread-safe clients so keep-alive connections are reused across domains
+_SCRAPE_CLIENT = httpx.Client(
+    http2=HTTP2_AVAILABLE,
+    timeout=30.0,
+    follow_redirects=True,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    headers={"User-Agent": USER_AGENT},
+)
+_OLLAMA_CLIENT = httpx.Client(
+    base_url=OLLAMA_URL,
+    timeout=300.0,
+    limits=httpx.Limits(max_keepalive_connections=16),
+)
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -24,7 +94,6 @@ class AgentState(TypedDict):
     """State passed between nodes"""
 
     domain: str
-    raw_html: str
     preprocessed_text: str
     llm_response: str
     extracted_data: dict
@@ -32,137 +101,409 @@ class AgentState(TypedDict):
     error: str
     messages: Annotated[Sequence[str], operator.add]
     skip_save: bool
+    # Per-stage wall-clock seconds, recorded by the async (batch) nodes
+    timings: Annotated[dict, operator.or_]
+
+
+def html_to_text(html: str) -> str:
+    """Extract visible text from HTML, dropping scripts/styles/iframes."""
+    if LexborHTMLParser is not None:
+        try:
+            tree = LexborHTMLParser(html)
+            for sel in STRIP_TAGS:
+                for node in tree.css(sel):
+                    node.decompose()
+            return tree.body.text(separator=" ", strip=True) if tree.body else ""
+        except Exception as e:
+            logging.debug(f"[SCRAPE] Lexbor parse failed, falling back to bs4: {e}")
+
+    soup = BeautifulSoup(html, "lxml")
+    for tag in soup(list(STRIP_TAGS)):
+        tag.decompose()
+    return soup.get_text(separator=" ", strip=True)
+
+
+def page_text(html: str) -> str:
+    """Parse, preprocess and trim page text to the LLM's text budget."""
+    return preprocess_text(html_to_text(html))[:MAX_TEXT_CHARS]
+
+
+def _decode_capped(response: httpx.Response, chunks: list) -> str:
+    body = b"".join(chunks)[:MAX_HTML_BYTES]
+    return body.decode(response.encoding or "utf-8", errors="replace")
+
+
+def fetch_html(url: str) -> str:
+    """GET url on the shared client, reading at most MAX_HTML_BYTES of body."""
+    chunks, total = [], 0
+    with _SCRAPE_CLIENT.stream("GET", url) as response:
+        response.raise_for_status()
+        for chunk in response.iter_bytes():
+            chunks.append(chunk)
+            total += len(chunk)
+            if total >= MAX_HTML_BYTES:
+                break
+    return _decode_capped(response, chunks)
+
+
+async def fetch_html_async(client: httpx.AsyncClient, url: str) -> str:
+    """Async fetch_html: stream the body and stop at MAX_HTML_BYTES."""
+    chunks, total = [], 0
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            chunks.append(chunk)
+            total += len(chunk)
+            if total >= MAX_HTML_BYTES:
+                break
+    return _decode_capped(response, chunks)
+
+
+def _scraped_state(domain: str, text: str) -> AgentState:
+    if len(text) < MIN_USEFUL_CHARS:
+        logging.info(f"[SCRAPE] {domain}: only {len(text)} chars, skipping LLM")
+        return {
+            "preprocessed_text": text,
+            "status": "too_short",
+            "error": f"Page text too short ({len(text)} chars)",
+            "messages": [f"[SKIP] {domain}: {len(text)} chars, not worth extracting"],
+        }
+    return {
+        "preprocessed_text": text,
+        "status": "preprocessed",
+        "messages": [f"[OK] Scraped {domain}: {len(text)} chars"],
+    }
 
 
 # Node Functions
+# Nodes return only the keys they change; LangGraph merges them into the state
 def scrape_website(state: AgentState) -> AgentState:
-    """Node 1: Scrape website content"""
+    """Node 1: Scrape website content and preprocess the extracted text"""
     domain = state["domain"]
     logging.info(f"[SCRAPE] Starting scrape for {domain}")
 
     try:
         url = f"https://{domain}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+        html = fetch_html(url)
+
+        return _scraped_state(domain, page_text(html))
+
+    except Exception as e:
+        logging.error(f"[SCRAPE] Failed {domain}: {e}")
+        return {
+            "status": "scrape_failed",
+            "error": str(e),
+            "messages": [f"[ERR] Scrape failed {domain}: {e}"],
         }
 
-        with httpx.Client(timeout=30.0, follow_redirects=True) as client:
-            response = client.get(url, headers=headers)
-            response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, "html.parser")
+async def scrape_website_async(
+    state: AgentState, client: httpx.AsyncClient, sem: asyncio.Semaphore
+) -> AgentState:
+    """Node 1 (async): Scrape and preprocess website content on a shared AsyncClient.
 
-        # Remove scripts and styles
-        for tag in soup(["script", "style", "noscript", "iframe"]):
-            tag.decompose()
+    The semaphore bounds in-flight requests; HTML parsing and preprocessing
+    are pushed to a thread so they do not stall the event loop.
+    """
+    domain = state["domain"]
+    logging.info(f"[SCRAPE] Starting scrape for {domain}")
 
-        text = soup.get_text(separator=" ", strip=True)
+    start = time.perf_counter()
+    try:
+        url = f"https://{domain}"
+        async with sem:
+            html = await fetch_html_async(client, url)
+
+        text = await asyncio.to_thread(page_text, html)
 
         return {
-            **state,
-            "raw_html": response.text,
-            "preprocessed_text": text,
-            "status": "scraped",
-            "messages": [f"[OK] Scraped {domain}: {len(text)} chars"],
+            **_scraped_state(domain, text),
+            "timings": {"scrape": time.perf_counter() - start},
         }
 
     except Exception as e:
         logging.error(f"[SCRAPE] Failed {domain}: {e}")
         return {
-            **state,
             "status": "scrape_failed",
             "error": str(e),
             "messages": [f"[ERR] Scrape failed {domain}: {e}"],
         }
 
 
-def preprocess_content(state: AgentState) -> AgentState:
-    """Node 2: Preprocess scraped content"""
+def warm_up_model() -> None:
+    """Load the model into Ollama and pin it before the first domain arrives.
+
+    The static instruction prefix is sent as the prompt so its KV cache is
+    already populated; later prompts only need their domain-specific tail
+    prefilled.
+    """
+    try:
+        response = _OLLAMA_CLIENT.post(
+            "/api/generate",
+            json={
+                "model": OLLAMA_MODEL,
+                "prompt": PROMPT_PREFIX,
+                "stream": False,
+                "keep_alive": OLLAMA_KEEP_ALIVE,
+                "options": {"temperature": 0, "num_ctx": NUM_CTX, "num_predict": 1},
+            },
+        )
+        response.raise_for_status()
+        logging.info(f"[LLM] Model {OLLAMA_MODEL} loaded (keep_alive={OLLAMA_KEEP_ALIVE})")
+    except Exception as e:
+        logging.warning(f"[LLM] Model warm-up failed: {e}")
+
+
+def _build_llm_payload(state: AgentState) -> dict:
+    # No tech-stack detection in the agent path; the static prefix stays first
+    prompt = build_prompt(state["preprocessed_text"], [], state["domain"])
+    return {
+        "model": OLLAMA_MODEL,
+        "prompt": prompt,
+        "stream": False,
+        "format": PROFILE_SCHEMA,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "options": {
+            "temperature": 0,
+            "num_ctx": NUM_CTX,
+            "num_predict": NUM_PREDICT,
+            "num_thread": 3,
+        },
+    }
+
+
+def _extracted_state(state: AgentState, llm_output: str) -> AgentState:
+    domain = state["domain"]
+    data = orjson.loads(llm_output)
+    return {
+        "llm_response": llm_output,
+        "extracted_data": data,
+        "status": "extracted",
+        "messages": [f"[OK] Extracted data for {domain}"],
+    }
+
+
+def _extract_failed_state(state: AgentState, e: Exception) -> AgentState:
     domain = state["domain"]
-    logging.info(f"[PREPROCESS] Processing content for {domain}")
+    logging.error(f"[LLM] Failed {domain}: {e}")
+    return {
+        "status": "extraction_failed",
+        "error": str(e),
+        "messages": [f"[ERR] Extraction failed {domain}: {e}"],
+    }
+
+
+def extract_with_llm(state: AgentState) -> AgentState:
+    """Node 2: Extract structured data using LLM"""
+    logging.info(f"[LLM] Extracting data for {state['domain']}")
 
     try:
-        raw_text = state["preprocessed_text"]
-        processed = preprocess_text(raw_text)
+        payload = _build_llm_payload(state)
+        response = _OLLAMA_CLIENT.post(
+            "/api/generate", content=orjson.dumps(payload), headers=JSON_HEADERS
+        )
+        response.raise_for_status()
+        llm_output = orjson.loads(response.content).get("response", "{}")
+        return _extracted_state(state, llm_output)
+
+    except Exception as e:
+        return _extract_failed_state(state, e)
+
+
+class LLMBatcher:
+    """Groups concurrent extract requests into length bins before dispatch.
+
+    Requests are collected for up to `window` seconds (or until `batch_size`
+    are pending), split into bins by prompt length and each bin is sent as a
+    concurrent burst, shortest bin first. Short prompts therefore share
+    server-side batches with other short prompts instead of waiting behind
+    the longest one. num_ctx is left at NUM_CTX: varying it per bin would make
+    Ollama reload the model.
+    """
+
+    # Upper bounds (chars of preprocessed text) for each bin; the last bin is open
+    BIN_BOUNDS = (1000, 4000, 16000)
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        max_in_flight: int = OLLAMA_NUM_PARALLEL,
+        batch_size: int = 8,
+        window: float = 0.2,
+    ):
+        self.client = client
+        self.sem = asyncio.Semaphore(max_in_flight)
+        self.batch_size = batch_size
+        self.window = window
+        self._pending: list = []
+        self._timer = None
+        self._tasks: set = set()
+
+    async def generate(self, payload: dict, text_len: int) -> dict:
+        """Queue a generate payload and wait for Ollama's JSON reply."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text_len, payload, future))
+
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.window, self._flush
+            )
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, []
+        bins: dict = {}
+        for item in pending:
+            idx = sum(item[0] >= bound for bound in self.BIN_BOUNDS)
+            bins.setdefault(idx, []).append(item)
+
+        # Shortest bin first so it claims free slots ahead of long prompts
+        for idx in sorted(bins):
+            for _, payload, future in bins[idx]:
+                task = asyncio.ensure_future(self._dispatch(payload, future))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, payload: dict, future: asyncio.Future) -> None:
+        try:
+            async with self.sem:
+                response = await self.client.post(
+                    "/api/generate",
+                    content=orjson.dumps(payload),
+                    headers=JSON_HEADERS,
+                )
+            response.raise_for_status()
+            if not future.done():
+                future.set_result(orjson.loads(response.content))
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
 
+
+async def extract_with_llm_async(state: AgentState, batcher: LLMBatcher) -> AgentState:
+    """Node 2 (async): Extract structured data using LLM
+
+    Requests go through a shared LLMBatcher so several generates are in
+    flight at once and Ollama can batch similar-length prompts server-side.
+    """
+    logging.info(f"[LLM] Extracting data for {state['domain']}")
+
+    start = time.perf_counter()
+    try:
+        payload = _build_llm_payload(state)
+        result = await batcher.generate(payload, len(state["preprocessed_text"]))
+        llm_output = result.get("response", "{}")
         return {
-            **state,
-            "preprocessed_text": processed,
-            "status": "preprocessed",
-            "messages": [f"[OK] Preprocessed {domain}: {len(processed)} chars"],
+            **_extracted_state(state, llm_output),
+            "timings": {"extract": time.perf_counter() - start},
         }
 
     except Exception as e:
-        logging.error(f"[PREPROCESS] Failed {domain}: {e}")
-        return {
-            **state,
-            "status": "preprocess_failed",
-            "error": str(e),
-            "messages": [f"[ERR] Preprocess failed {domain}: {e}"],
-        }
+        return _extract_failed_state(state, e)
 
 
-def extract_with_llm(state: AgentState) -> AgentState:
-    """Node 3: Extract structured data using LLM"""
+def save_to_database(state: AgentState) -> AgentState:
+    """Node 3: Save extracted data to database"""
     domain = state["domain"]
-    logging.info(f"[LLM] Extracting data for {domain}")
+    logging.info(f"[DB] Saving data for {domain}")
 
     try:
-        text = state["preprocessed_text"]
-        prompt = build_prompt(text, domain)
-
-        # Call Ollama
-        payload = {
-            "model": "llama3.2:3b",
-            "prompt": prompt,
-            "stream": False,
-            "format": "json",
-            "options": {
-                "temperature": 0,
-                "num_ctx": 2048,
-                "num_predict": 2000,
-                "num_thread": 3,
-            },
-        }
-
-        with httpx.Client(timeout=300.0) as client:
-            response = client.post("http://127.0.0.1:11434/api/generate", json=payload)
-            response.raise_for_status()
-            result = response.json()
-            llm_output = result.get("response", "{}")
-
-        # Parse JSON
-        data = json.loads(llm_output)
+        data = state["extracted_data"]
+        save_extracted_data(domain, data)
 
         return {
-            **state,
-            "llm_response": llm_output,
-            "extracted_data": data,
-            "status": "extracted",
-            "messages": [f"[OK] Extracted data for {domain}"],
+            "status": "saved",
+            "messages": [f"[OK] Saved {domain} to database"],
         }
 
     except Exception as e:
-        logging.error(f"[LLM] Failed {domain}: {e}")
+        logging.error(f"[DB] Failed {domain}: {e}")
         return {
-            **state,
-            "status": "extraction_failed",
+            "status": "save_failed",
             "error": str(e),
-            "messages": [f"[ERR] Extraction failed {domain}: {e}"],
+            "messages": [f"[ERR] Save failed {domain}: {e}"],
         }
 
 
-def save_to_database(state: AgentState) -> AgentState:
-    """Node 4: Save extracted data to database"""
+class SaveBatcher:
+    """Buffers extracted profiles and writes them in one transaction per batch.
+
+    A flush happens once `batch_size` profiles are waiting or `window`
+    seconds after the first one arrived. Flushes run one at a time in a worker
+    thread; if a batch fails, its items are retried individually so a single
+    bad profile only fails its own domain.
+    """
+
+    def __init__(self, batch_size: int = 16, window: float = 1.0):
+        self.batch_size = batch_size
+        self.window = window
+        self._pending: list = []
+        self._timer = None
+        self._lock = asyncio.Lock()
+        self._tasks: set = set()
+
+    async def save(self, domain: str, data: dict) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((domain, data, future))
+
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.window, self._flush
+            )
+
+        await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.ensure_future(self._write(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _write(self, pending: list) -> None:
+        async with self._lock:
+            items = [(domain, data) for domain, data, _ in pending]
+            try:
+                await asyncio.to_thread(save_extracted_batch, items)
+                for _, _, future in pending:
+                    if not future.done():
+                        future.set_result(None)
+                return
+            except Exception as e:
+                logging.warning(f"[DB] Batch save failed, retrying per domain: {e}")
+
+            for domain, data, future in pending:
+                try:
+                    await asyncio.to_thread(save_extracted_batch, [(domain, data)])
+                    if not future.done():
+                        future.set_result(None)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+async def save_to_database_async(state: AgentState, batcher: SaveBatcher) -> AgentState:
+    """Node 3 (async): Save extracted data through a shared SaveBatcher"""
     domain = state["domain"]
     logging.info(f"[DB] Saving data for {domain}")
 
     try:
-        data = state["extracted_data"]
-        save_extracted_data(domain, data)
+        await batcher.save(domain, state["extracted_data"])
 
         return {
-            **state,
             "status": "saved",
             "messages": [f"[OK] Saved {domain} to database"],
         }
@@ -170,7 +511,6 @@ def save_to_database(state: AgentState) -> AgentState:
     except Exception as e:
         logging.error(f"[DB] Failed {domain}: {e}")
         return {
-            **state,
             "status": "save_failed",
             "error": str(e),
             "messages": [f"[ERR] Save failed {domain}: {e}"],
@@ -180,14 +520,6 @@ def save_to_database(state: AgentState) -> AgentState:
 # Conditional edges
 def should_continue_after_scrape(state: AgentState) -> str:
     """Router after scraping"""
-    if state["status"] == "scraped":
-        return "preprocess"
-    else:
-        return "end"
-
-
-def should_continue_after_preprocess(state: AgentState) -> str:
-    """Router after preprocessing"""
     if state["status"] == "preprocessed":
         return "extract"
     else:
@@ -211,7 +543,6 @@ def create_agent_graph():
 
     # Add nodes
     workflow.add_node("scrape", scrape_website)
-    workflow.add_node("preprocess", preprocess_content)
     workflow.add_node("extract", extract_with_llm)
     workflow.add_node("save", save_to_database)
 
@@ -220,13 +551,7 @@ def create_agent_graph():
 
     # Add conditional edges
     workflow.add_conditional_edges(
-        "scrape", should_continue_after_scrape, {"preprocess": "preprocess", "end": END}
-    )
-
-    workflow.add_conditional_edges(
-        "preprocess",
-        should_continue_after_preprocess,
-        {"extract": "extract", "end": END},
+        "scrape", should_continue_after_scrape, {"extract": "extract", "end": END}
     )
 
     workflow.add_conditional_edges(
@@ -239,15 +564,14 @@ def create_agent_graph():
     return workflow.compile()
 
 
-# Run agent
-def process_domain(domain: str, skip_save: bool = False) -> dict:
-    """Process a single domain through the agent graph"""
-    logging.info(f"=== Starting Agent for {domain} (skip_save={skip_save}) ===")
+# Compiled once at import; the compiled graph holds no per-run state
+_GRAPH = create_agent_graph()
+
 
-    # Initialize state
-    initial_state = {
+# Run agent
+def _initial_state(domain: str, skip_save: bool) -> AgentState:
+    return {
         "domain": domain,
-        "raw_html": "",
         "preprocessed_text": "",
         "llm_response": "",
         "extracted_data": {},
@@ -255,21 +579,117 @@ def process_domain(domain: str, skip_save: bool = False) -> dict:
         "error": "",
         "messages": [],
         "skip_save": skip_save,
+        "timings": {},
     }
 
-    # Create and run graph
-    graph = create_agent_graph()
-    result = graph.invoke(initial_state)
 
-    # Log final status
+def _log_result(domain: str, result: dict) -> None:
     for msg in result.get("messages", []):
         logging.info(msg)
 
     logging.info(f"=== Agent Complete: {domain} - Status: {result['status']} ===\n")
 
+
+def process_domain(domain: str, skip_save: bool = False) -> dict:
+    """Process a single domain through the agent graph"""
+    logging.info(f"=== Starting Agent for {domain} (skip_save={skip_save}) ===")
+
+    result = _GRAPH.invoke(_initial_state(domain, skip_save))
+
+    _log_result(domain, result)
     return result
 
 
+def _merge_state(state: AgentState, update: dict) -> AgentState:
+    """Apply a node's partial update using the same reducers as AgentState."""
+    merged = {**state, **update}
+    if "messages" in update:
+        merged["messages"] = list(state.get("messages", [])) + list(update["messages"])
+    if "timings" in update:
+        merged["timings"] = {**state.get("timings", {}), **update["timings"]}
+    return merged
+
+
+async def _run_stage(
+    in_q: asyncio.Queue,
+    node: Callable,
+    finish: Callable,
+    router: Callable = None,
+    next_name: str = None,
+    next_q: asyncio.Queue = None,
+) -> None:
+    while (state := await in_q.get()) is not None:
+        state = _merge_state(state, await node(state))
+        if next_q is not None and router(state) == next_name:
+            await next_q.put(state)
+        else:
+            finish(state)
+
+
+async def process_domains_pipelined(
+    domains: Iterable[str],
+    scrape_node: Callable,
+    extract_node: Callable,
+    save_node: Callable,
+    scrape_workers: int,
+    extract_workers: int = OLLAMA_NUM_PARALLEL * 2,
+    save_workers: int = 16,
+    skip_save: bool = False,
+    on_result: Callable = None,
+) -> list:
+    """Run domains through scrape -> extract -> save as a pipeline.
+
+    Each stage has its own pool of coroutines connected by bounded queues, so
+    slow LLM calls don't hold back scraping and only a bounded number of
+    scraped pages wait in memory. Routing reuses the graph's conditional edge
+    functions; nodes must be the async variants bound to their clients.
+    """
+    scrape_q: asyncio.Queue = asyncio.Queue(maxsize=scrape_workers)
+    extract_q: asyncio.Queue = asyncio.Queue(maxsize=extract_workers * 2)
+    save_q: asyncio.Queue = asyncio.Queue(maxsize=save_workers * 2)
+    results: list = []
+
+    def finish(state: AgentState) -> None:
+        _log_result(state["domain"], state)
+        results.append(state)
+        if on_result is not None:
+            on_result(state)
+
+    def spawn(n: int, *args) -> list:
+        return [asyncio.create_task(_run_stage(*args)) for _ in range(n)]
+
+    scrapers = spawn(
+        scrape_workers,
+        scrape_q,
+        scrape_node,
+        finish,
+        should_continue_after_scrape,
+        "extract",
+        extract_q,
+    )
+    extractors = spawn(
+        extract_workers,
+        extract_q,
+        extract_node,
+        finish,
+        should_continue_after_extract,
+        "save",
+        save_q,
+    )
+    savers = spawn(save_workers, save_q, save_node, finish)
+
+    for domain in domains:
+        await scrape_q.put(_initial_state(domain, skip_save))
+
+    # Drain stage by stage: a stage is told to stop only once its upstream is done
+    for workers, q in ((scrapers, scrape_q), (extractors, extract_q), (savers, save_q)):
+        for _ in workers:
+            await q.put(None)
+        await asyncio.gather(*workers)
+
+    return results
+
+
 if __name__ == "__main__":
     # Initialize database
     db_new.init_db()
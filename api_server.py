@@ -12,22 +12,34 @@ from fastapi import (
     WebSocket,
     WebSocketDisconnect,
 )
-from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Set
 import io
 import csv
+import json
+import queue
 import sqlite3
 import asyncio
+from collections import deque
+from contextlib import closing, contextmanager
+from itertools import islice
 from pathlib import Path
 import logging
+import os
 from agent_graph import process_domain
 import db_new
-from worker_new import save_extracted_data
+from worker_new import save_extracted_data, save_extracted_data_bulk
 import time
 from redis_manager import get_redis_manager
 
+# C-level CSV parsing for uploads; the csv module remains the fallback
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
+
 logging.basicConfig(level=logging.INFO)
 app = FastAPI(title="Company Intelligence API")
 
@@ -36,7 +48,14 @@ REDIS_AVAILABLE = False
 try:
     redis_manager = get_redis_manager()
     REDIS_AVAILABLE = redis_manager.ping()
-    if REDIS_AVAILABLE:
+    if REDIS_AVAILABLE and not redis_manager.server_supported():
+        REDIS_AVAILABLE = False
+        logging.warning(
+            f"Redis {redis_manager.server_version()} is older than "
+            f"{'.'.join(map(str, redis_manager.MIN_SERVER_VERSION))} - "
+            "parallel processing disabled"
+        )
+    elif REDIS_AVAILABLE:
         logging.info("Redis connected - parallel processing available")
     else:
         logging.warning("Redis not available - parallel processing disabled")
@@ -52,7 +71,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global state for tracking jobs
+# In-process jobs, only created when Redis is down. With Redis up every
+# job lives there, so any uvicorn worker can serve its status.
 processing_jobs = {}
 
 
@@ -121,44 +141,102 @@ class CompanyData(BaseModel):
     services: List[str]
 
 
-def normalize_domains(raw_domains: List[str]) -> List[str]:
-    """Split domains on commas/whitespace, strip protocol/paths, dedupe."""
-    cleaned: List[str] = []
+_URL_SCHEMES = ("http://", "https://")
+
+
+def _iter_domain_tokens(raw_domains: List[str]):
     for entry in raw_domains:
         if not entry:
             continue
         # Allow space- or comma-separated domains in a single line
         for token in entry.replace(",", " ").split():
-            d = token.strip()
-            if not d:
-                continue
-            d = d.lower()
-            if d.startswith(("http://", "https://")):
-                d = d.split("://", 1)[-1]
-            d = d.split("/")[0]
-            cleaned.append(d)
-
-    # Preserve order while removing duplicates
-    seen = set()
-    result: List[str] = []
-    for d in cleaned:
-        if d in seen:
-            continue
-        seen.add(d)
-        result.append(d)
-    return result
+            d = token.lower()
+            if d.startswith(_URL_SCHEMES):
+                d = d.removeprefix("http://").removeprefix("https://")
+            yield d.split("/", 1)[0]
+
+
+def normalize_domains(raw_domains: List[str]) -> List[str]:
+    """Split domains on commas/whitespace, strip protocol/paths, dedupe."""
+    # dict.fromkeys preserves order while removing duplicates
+    return list(dict.fromkeys(_iter_domain_tokens(raw_domains)))
+
+
+# Domains scraped/extracted concurrently within one sequential-mode job
+JOB_CONCURRENCY = 8
+# Extraction pauses while this many results are waiting for approval
+MAX_PENDING = 128
+# job_id -> set while the job's approval queue has room (kept out of the
+# job dict so get_status can still serialize it)
+_drain_events: Dict[str, asyncio.Event] = {}
+# job_id -> event set (then replaced) whenever an in-process job changes,
+# waking every /api/status_stream listener at once
+_job_changed: Dict[str, asyncio.Event] = {}
+
+
+# Log entries kept per in-process job, and how many /api/status returns
+LOG_HISTORY = 2000
+STATUS_LOG_PAGE = 200
+
+
+def _append_log(job: dict, entry: dict) -> None:
+    """Append to a job's bounded log, counting every entry ever written."""
+    job["logs"].append(entry)
+    job["log_count"] = job.get("log_count", 0) + 1
 
 
-def process_domains_background(job_id: str, domains: List[str]):
-    """Background task to process domains. Queues extracted data for approval without blocking."""
+def _log_page(logs, total: int, log_offset: Optional[int]) -> dict:
+    """Up to STATUS_LOG_PAGE entries from absolute index log_offset (default: the tail).
+
+    `logs` holds the newest len(logs) of `total` entries. Each returned
+    entry carries its seq (absolute index + 1); last_seq is the seq of the
+    last one, ready to pass back as ?since=.
+    """
+    first = total - len(logs)
+    if log_offset is None:
+        start = max(first, total - STATUS_LOG_PAGE)
+    else:
+        start = min(max(first, log_offset), total)
+    page = [
+        {**entry, "seq": seq}
+        for seq, entry in enumerate(
+            islice(logs, start - first, start - first + STATUS_LOG_PAGE), start + 1
+        )
+    ]
+    return {
+        "logs": page,
+        "log_offset": start,
+        "log_total": total,
+        "last_seq": start + len(page),
+    }
+
+
+# Per-domain maps that grow with the job; ?since= polls leave them out
+DELTA_OMITTED = ("domains", "pending_approvals", "approved_data", "rejected_domains")
+
+
+def _notify_job_changed(job_id: str) -> None:
+    changed = _job_changed.pop(job_id, None)
+    if changed is not None:
+        changed.set()
+
+
+async def process_domains_background_async(job_id: str, domains: List[str]):
+    """Background task to process domains. Queues extracted data for approval without blocking.
+
+    Up to JOB_CONCURRENCY domains run at once in worker threads; each result
+    lands in the job as soon as it finishes.
+    """
     from datetime import datetime
 
     def add_log(level: str, message: str):
         """Add a log entry"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        processing_jobs[job_id]["logs"].append(
-            {"timestamp": timestamp, "level": level, "message": message}
+        _append_log(
+            processing_jobs[job_id],
+            {"timestamp": timestamp, "level": level, "message": message},
         )
+        _notify_job_changed(job_id)
 
     processing_jobs[job_id] = {
         "status": "processing",
@@ -166,7 +244,8 @@ def process_domains_background(job_id: str, domains: List[str]):
         "completed": 0,
         "failed": 0,
         "current_domain": None,
-        "logs": [],
+        "logs": deque(maxlen=LOG_HISTORY),
+        "log_count": 0,
         "pending_approvals": {},
         "approved_data": {},
         "rejected_domains": [],
@@ -174,33 +253,46 @@ def process_domains_background(job_id: str, domains: List[str]):
 
     add_log("info", f"🚀 Starting to process {len(domains)} domains")
 
-    for domain in domains:
-        processing_jobs[job_id]["current_domain"] = domain
-        try:
-            add_log("info", f"🔍 Scraping & Extracting {domain}...")
-
-            result = process_domain(domain, skip_save=True)
+    sem = asyncio.Semaphore(JOB_CONCURRENCY)
+    drained = _drain_events[job_id] = asyncio.Event()
+    drained.set()
 
-            if result.get("extracted_data") and result["status"] == "extracted":
-                processing_jobs[job_id]["pending_approvals"][domain] = result[
-                    "extracted_data"
-                ]
-                add_log(
-                    "info",
-                    f"⏳ {domain} extracted - queued for approval (non-blocking)",
-                )
-            else:
-                processing_jobs[job_id]["failed"] += 1
-                add_log(
-                    "error",
-                    f"❌ Failed to extract {domain}: {result.get('error', 'Unknown error')}",
-                )
-
-        except Exception as e:
-            logging.error(f"Error processing {domain}: {e}")
+    async def one(domain: str):
+        async with sem:
+            while len(processing_jobs[job_id]["pending_approvals"]) >= MAX_PENDING:
+                drained.clear()
+                await drained.wait()
+            processing_jobs[job_id]["current_domain"] = domain
+            add_log("info", f"🔍 Scraping & Extracting {domain}...")
+            try:
+                result = await asyncio.to_thread(process_domain, domain, skip_save=True)
+            except Exception as e:
+                return domain, None, e
+            return domain, result, None
+
+    tasks = [asyncio.create_task(one(d)) for d in domains]
+    for fut in asyncio.as_completed(tasks):
+        domain, result, error = await fut
+        if error is not None:
+            logging.error(f"Error processing {domain}: {error}")
+            processing_jobs[job_id]["failed"] += 1
+            add_log("error", f"❌ Error processing {domain}: {str(error)}")
+        elif result.get("extracted_data") and result["status"] == "extracted":
+            processing_jobs[job_id]["pending_approvals"][domain] = result[
+                "extracted_data"
+            ]
+            add_log(
+                "info",
+                f"⏳ {domain} extracted - queued for approval (non-blocking)",
+            )
+        else:
             processing_jobs[job_id]["failed"] += 1
-            add_log("error", f"❌ Error processing {domain}: {str(e)}")
+            add_log(
+                "error",
+                f"❌ Failed to extract {domain}: {result.get('error', 'Unknown error')}",
+            )
 
+    _drain_events.pop(job_id, None)
     processing_jobs[job_id]["status"] = "waiting_approval"
     processing_jobs[job_id]["current_domain"] = None
 
@@ -211,32 +303,61 @@ def process_domains_background(job_id: str, domains: List[str]):
     )
 
 
+def _start_job(
+    domains: List[str], background_tasks: BackgroundTasks
+) -> tuple:
+    """Queue an approval-gated job; returns (job_id, mode).
+
+    With Redis up, extraction runs in redis_worker processes so it never
+    competes with the API's event loop; otherwise it runs in-process.
+    """
+    import uuid
+
+    if REDIS_AVAILABLE:
+        job_id = get_redis_manager().create_job(domains, require_approval=True)
+        return job_id, "redis_queue"
+
+    job_id = str(uuid.uuid4())
+    background_tasks.add_task(process_domains_background_async, job_id, domains)
+    return job_id, "sequential"
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup"""
     db_new.init_db()
+    # The final DB belongs to another pipeline and is only read here; it is
+    # indexed only when explicitly asked for
+    index_dbs = (FINAL_DB, AGENT_DB) if INDEX_FINAL_DB else (AGENT_DB,)
+    for db_path in index_dbs:
+        await asyncio.to_thread(_ensure_domain_index, db_path)
+    for _ in range(READ_POOL_SIZE):
+        _READ_POOL.put(_open_ro())
+    app.state.write_behind = asyncio.create_task(_write_behind_loop())
     logging.info("Database initialized")
 
 
-@app.post("/api/process")
-async def start_processing(input_data: DomainInput, background_tasks: BackgroundTasks):
-    """Start processing domains (sequential mode)"""
-    import uuid
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush approvals still waiting in the write-behind queue"""
+    await _write_q.join()
+    app.state.write_behind.cancel()
 
-    job_id = str(uuid.uuid4())
 
+@app.post("/api/process")
+async def start_processing(input_data: DomainInput, background_tasks: BackgroundTasks):
+    """Start processing domains; results are queued for approval"""
     domains = normalize_domains(input_data.domains)
     if not domains:
         raise HTTPException(status_code=400, detail="No valid domains provided")
 
-    # Start background processing (sequential)
-    background_tasks.add_task(process_domains_background, job_id, domains)
+    job_id, mode = _start_job(domains, background_tasks)
 
     return {
         "job_id": job_id,
-        "message": "Processing started (sequential)",
+        "message": f"Processing started ({mode})",
         "count": len(domains),
-        "mode": "sequential",
+        "mode": mode,
     }
 
 
@@ -265,27 +386,106 @@ async def start_processing_redis(input_data: DomainInput):
     }
 
 
+def _open_ro(db_path: Optional[Path] = None) -> sqlite3.Connection:
+    """Read-only, PRAGMA-tuned connection for the query endpoints."""
+    return db_new.get_conn(db_path, read_only=True)
+
+
+# Reused read-only connections to the agent DB (filled at startup), so
+# requests don't reopen db.sqlite/-wal/-shm every time
+READ_POOL_SIZE = 8
+_READ_POOL: queue.Queue = queue.Queue(maxsize=READ_POOL_SIZE)
+
+# SQLite allows one writer at a time; approvals take this before saving
+_WRITE_LOCK = asyncio.Lock()
+
+
+@contextmanager
+def _checkout():
+    conn = _READ_POOL.get()
+    try:
+        yield conn
+    finally:
+        _READ_POOL.put(conn)
+
+
 # Utilities to read domains from a SQLite database
-def _get_distinct_domains(db_path: Path) -> List[str]:
+def _normalize_db_domain(d: str) -> str:
+    d = d.strip().lower()
+    if d.startswith(_URL_SCHEMES):
+        d = d.split("://", 1)[-1]
+    return d.split("/", 1)[0]
+
+
+# GROUP BY domain walks idx_contact_information_domain (see
+# _ensure_domain_index), so norm_domain runs once per distinct raw domain.
+_DOMAINS_SUBQUERY = """
+    SELECT norm_domain(domain) AS d FROM (
+        SELECT domain FROM {schema}.contact_information
+        WHERE domain IS NOT NULL AND domain != ''
+        GROUP BY domain
+    )
+"""
+FINAL_DOMAINS_QUERY = f"""
+SELECT DISTINCT d FROM ({_DOMAINS_SUBQUERY.format(schema="main")})
+WHERE d != '' ORDER BY d LIMIT ?
+"""
+NEW_FINAL_DOMAINS_QUERY = f"""
+SELECT d FROM (
+    {_DOMAINS_SUBQUERY.format(schema="main")}
+    EXCEPT
+    {_DOMAINS_SUBQUERY.format(schema="agent")}
+)
+WHERE d != '' ORDER BY d LIMIT ?
+"""
+
+WORKSPACE_ROOT = Path(__file__).resolve().parent.parent
+FINAL_DB = WORKSPACE_ROOT / "final" / "db.sqlite"
+AGENT_DB = WORKSPACE_ROOT / "agent" / "db.sqlite"
+# Opt-in: let startup add idx_contact_information_domain to FINAL_DB
+INDEX_FINAL_DB = os.environ.get("INDEX_FINAL_DB") == "1"
+
+
+def _ensure_domain_index(db_path: Path) -> None:
+    """Index contact_information(domain) in a DB process_from_final reads."""
     if not db_path.exists():
-        raise FileNotFoundError(f"Database not found: {db_path}")
-    conn = sqlite3.connect(str(db_path))
-    c = conn.cursor()
+        return
+    try:
+        with closing(db_new.get_conn(db_path)) as conn, conn:
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_contact_information_domain "
+                "ON contact_information(domain)"
+            )
+            conn.execute("PRAGMA optimize")
+    except sqlite3.Error as e:
+        logging.warning(f"Could not index {db_path}: {e}")
+
+
+def _select_final_domains(
+    final_db: Path, agent_db: Path, only_new: bool, limit: Optional[int] = None
+) -> List[str]:
+    """Sorted, normalized domains from the final DB, minus the agent DB's if only_new.
+
+    The agent DB is ATTACHed so the difference runs as a SQL EXCEPT instead
+    of two full domain sets in Python.
+    """
+    if not final_db.exists():
+        raise FileNotFoundError(f"Database not found: {final_db}")
+
+    query = FINAL_DOMAINS_QUERY
+    conn = _open_ro(final_db)
     try:
-        c.execute("SELECT DISTINCT domain FROM contact_information")
-        rows = c.fetchall()
+        conn.create_function("norm_domain", 1, _normalize_db_domain, deterministic=True)
+        if only_new and agent_db.exists():
+            conn.execute("ATTACH DATABASE ? AS agent", (str(agent_db),))
+            query = NEW_FINAL_DOMAINS_QUERY
+
+        rows = conn.execute(
+            query, (-1 if limit is None else max(0, int(limit)),)
+        ).fetchall()
     finally:
         conn.close()
-    domains: List[str] = []
-    for (d,) in rows:
-        if not d:
-            continue
-        d = d.strip().lower()
-        if d.startswith("http://") or d.startswith("https://"):
-            d = d.split("://", 1)[-1]
-        d = d.split("/")[0]
-        domains.append(d)
-    return sorted(set(domains))
+    return [d for (d,) in rows]
 
 
 class ProcessFinalInput(BaseModel):
@@ -302,68 +502,62 @@ async def process_from_final(
     only_new=True will exclude domains already present in the agent DB.
     limit can restrict the number of domains to process.
     """
-    import uuid
-
-    workspace_root = Path(__file__).resolve().parent.parent
-    final_db = workspace_root / "final" / "db.sqlite"
-    agent_db = workspace_root / "agent" / "db.sqlite"
-
-    final_domains = _get_distinct_domains(final_db)
-    to_process = final_domains
-
-    if input_data.only_new and agent_db.exists():
-        agent_domains = _get_distinct_domains(agent_db)
-        to_process = sorted(set(final_domains) - set(agent_domains))
-
-    if input_data.limit is not None:
-        to_process = to_process[: max(0, int(input_data.limit))]
+    to_process = await asyncio.to_thread(
+        _select_final_domains,
+        FINAL_DB,
+        AGENT_DB,
+        input_data.only_new,
+        input_data.limit,
+    )
 
     if not to_process:
         raise HTTPException(
             status_code=400, detail="No domains to process from final DB"
         )
 
-    job_id = str(uuid.uuid4())
-    background_tasks.add_task(process_domains_background, job_id, to_process)
-
-    # Initialize job state immediately so status endpoint is available
-    processing_jobs[job_id] = {
-        "status": "queued",
-        "total": len(to_process),
-        "completed": 0,
-        "failed": 0,
-        "current_domain": None,
-        "logs": [
-            {
-                "timestamp": "",
-                "level": "info",
-                "message": f"Queued {len(to_process)} domains from final DB",
-            }
-        ],
-        "last_extracted": None,
-        "accepted_domains": {},
-    }
+    job_id, mode = _start_job(to_process, background_tasks)
+
+    if mode == "sequential":
+        # Initialize job state immediately so status endpoint is available
+        processing_jobs[job_id] = {
+            "status": "queued",
+            "total": len(to_process),
+            "completed": 0,
+            "failed": 0,
+            "current_domain": None,
+            "logs": deque(
+                [
+                    {
+                        "timestamp": "",
+                        "level": "info",
+                        "message": f"Queued {len(to_process)} domains from final DB",
+                    }
+                ],
+                maxlen=LOG_HISTORY,
+            ),
+            "log_count": 1,
+            "last_extracted": None,
+            "accepted_domains": {},
+        }
 
     return {
         "job_id": job_id,
         "message": "Processing started from final DB",
         "count": len(to_process),
+        "mode": mode,
     }
 
 
-@app.post("/api/process_csv")
-async def start_processing_csv(
-    file: UploadFile = File(...), background_tasks: BackgroundTasks = None
-):
-    """Start processing domains from an uploaded CSV file.
+def _csv_domain_column(first_line: str) -> tuple:
+    """(has_header, domain column index) from the first CSV row."""
+    first_row = next(csv.reader([first_line]), [])
+    header_lower = [c.strip().lower() for c in first_row]
+    if "domain" in header_lower:
+        return True, header_lower.index("domain")
+    return False, 0
 
-    The CSV may include a header. If a header row contains a column named 'domain', that column is used.
-    Otherwise the first column is treated as domains.
-    """
-    import uuid
 
-    raw = await file.read()
-    text = raw.decode("utf-8", errors="ignore")
+def _read_csv_domains_py(text: str) -> List[str]:
     reader = csv.reader(io.StringIO(text))
 
     domains: List[str] = []
@@ -385,22 +579,84 @@ async def start_processing_csv(
         dom = row[domain_idx].strip()
         if dom:
             domains.append(dom)
+    return domains
+
+
+def _read_csv_domains(raw: bytes) -> List[str]:
+    """Raw domain values from an uploaded CSV.
+
+    Only the domain column is parsed, by pandas' C reader when available;
+    the csv module handles files pandas rejects, including ragged rows it
+    would otherwise drop.
+    """
+    text = raw.decode("utf-8", errors="ignore")
+    if pd is None:
+        return _read_csv_domains_py(text)
+
+    body = text.lstrip()
+    has_header, domain_idx = _csv_domain_column(body.split("\n", 1)[0])
+    try:
+        frame = pd.read_csv(
+            io.StringIO(body),
+            header=None,
+            skiprows=1 if has_header else 0,
+            usecols=[domain_idx],
+            dtype=str,
+            keep_default_na=False,
+            skip_blank_lines=True,
+            # A row with extra fields raises instead of being skipped, so the
+            # csv module below still picks up its domain
+            on_bad_lines="error",
+        )
+    except ValueError:  # ParserError, EmptyDataError, usecols out of range
+        return _read_csv_domains_py(text)
+
+    column = frame[domain_idx].dropna().str.strip()
+    return column[column != ""].tolist()
+
+
+@app.post("/api/process_csv")
+async def start_processing_csv(
+    file: UploadFile = File(...), background_tasks: BackgroundTasks = None
+):
+    """Start processing domains from an uploaded CSV file.
+
+    The CSV may include a header. If a header row contains a column named 'domain', that column is used.
+    Otherwise the first column is treated as domains.
+    """
+    raw = await file.read()
+    domains = await asyncio.to_thread(_read_csv_domains, raw)
 
     domains = normalize_domains(domains)
 
     if not domains:
         raise HTTPException(status_code=400, detail="No domains found in CSV")
 
-    job_id = str(uuid.uuid4())
-    background_tasks.add_task(process_domains_background, job_id, domains)
+    job_id, mode = _start_job(domains, background_tasks)
 
-    return {"job_id": job_id, "message": "Processing started", "count": len(domains)}
+    return {
+        "job_id": job_id,
+        "message": "Processing started",
+        "count": len(domains),
+        "mode": mode,
+    }
 
 
 @app.get("/api/status/{job_id}")
-async def get_status(job_id: str):
+async def get_status(
+    job_id: str, log_offset: Optional[int] = None, since: Optional[int] = None
+):
     """Get processing status with approval queue info.
-    Supports both sequential and Redis-based jobs."""
+    Supports both sequential and Redis-based jobs.
+
+    Only the newest STATUS_LOG_PAGE log entries are returned; pass
+    log_offset (an absolute entry index) to page through older ones.
+
+    Pollers should pass since=<last_seq from the previous response> instead:
+    only log entries after it are returned, and the per-domain maps are
+    left out (the counts are still there), so each poll stays small."""
+    if since is not None:
+        log_offset = since
 
     # Check if it's a Redis job first
     if REDIS_AVAILABLE:
@@ -422,58 +678,57 @@ async def get_status(job_id: str):
             # Get worker information
             workers = redis_manager.get_workers_for_job(job_id)
 
-            # Combine logs from job and from results
+            # Workers log every success and failure themselves
             logs = redis_job.get("logs", [])
-            
-            # Add result logs if not already in job logs
-            for domain, result in results.items():
-                if result.get("success"):
-                    logs.append(
-                        {
-                            "timestamp": (
-                                result["completed_at"][-8:]
-                                if result.get("completed_at")
-                                else ""
-                            ),
-                            "level": "success",
-                            "message": f"✅ {domain} processed successfully",
-                        }
-                    )
-                else:
-                    logs.append(
-                        {
-                            "timestamp": (
-                                result["completed_at"][-8:]
-                                if result.get("completed_at")
-                                else ""
-                            ),
-                            "level": "error",
-                            "message": f"❌ {domain} failed: {result.get('error', 'Unknown error')}",
-                        }
-                    )
-
-            return {
-                "status": redis_job["status"],
+
+            # Approval counters move in the same transaction as each result
+            # (see resolve_approval); jobs without require_approval are
+            # auto-approved, so every other success counts as approved
+            approvals = redis_job["approvals"]
+            pending_count = approvals["pending"]
+            rejected_count = approvals["rejected"]
+
+            status = redis_job["status"]
+            if status == "completed" and pending_count:
+                status = "waiting_approval"
+
+            response = {
+                "status": status,
                 "total": redis_job["total"],
                 "completed": successful,
                 "failed": failed,
                 "progress_percentage": progress_percentage,
                 "current_domain": None,
-                "logs": logs,
+                **_log_page(logs, redis_job.get("log_count", len(logs)), log_offset),
                 "workers": workers,
-                "pending_approvals": {},  # Redis workers auto-approve
-                "approved_data": {
-                    d: r["data"] for d, r in results.items() if r.get("success")
-                },
-                "rejected_domains": [],
-                "pending_count": 0,
-                "approved_count": successful,
-                "rejected_count": 0,
-                "mode": "redis_parallel",
+                "pending_count": pending_count,
+                "approved_count": successful - pending_count - rejected_count,
+                "rejected_count": rejected_count,
+                "mode": (
+                    "redis_queue"
+                    if redis_job.get("require_approval")
+                    else "redis_parallel"
+                ),
                 "metrics": redis_job.get("metrics", {}),
             }
-
-    # Fall back to sequential job
+            if since is None:
+                pending = {}
+                approved = {}
+                rejected = []
+                for d, r in results.items():
+                    approval = r.get("approval")
+                    if approval == "pending":
+                        pending[d] = r["data"]
+                    elif approval == "rejected":
+                        rejected.append(d)
+                    elif r.get("success"):
+                        approved[d] = r["data"]
+                response["pending_approvals"] = pending
+                response["approved_data"] = approved
+                response["rejected_domains"] = rejected
+            return response
+
+    # Fall back to in-process job (Redis unavailable)
     if job_id not in processing_jobs:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -486,8 +741,13 @@ async def get_status(job_id: str):
     if total > 0:
         progress_percentage = round(completed / total * 100)
     
+    logs = job.get("logs", ())
+    fields = job
+    if since is not None:
+        fields = {k: v for k, v in job.items() if k not in DELTA_OMITTED}
     return {
-        **job,
+        **fields,
+        **_log_page(logs, job.get("log_count", len(logs)), log_offset),
         "progress_percentage": progress_percentage,
         "pending_count": len(job.get("pending_approvals", {})),
         "approved_count": len(job.get("approved_data", {})),
@@ -544,119 +804,325 @@ async def websocket_job_status(websocket: WebSocket, job_id: str):
         manager.disconnect(websocket, job_id)
 
 
+# Status values after which a job only changes through approvals
+TERMINAL_STATUSES = ("completed", "waiting_approval")
+# Redis jobs are updated by other processes, so their streams re-check on a timer
+REDIS_STATUS_INTERVAL = 0.5
+SSE_HEARTBEAT = 15.0
+
+
+async def _status_events(job_id: str):
+    """Server-sent events carrying get_status whenever it changes."""
+    last = None
+    while True:
+        # Only in-process jobs are ever notified (and their events popped);
+        # Redis jobs are polled and must not leave an Event behind
+        changed = None
+        if job_id in processing_jobs:
+            # Grab the event before reading status so no change is missed
+            changed = _job_changed.setdefault(job_id, asyncio.Event())
+        try:
+            status = await get_status(job_id)
+        except HTTPException:
+            yield f"event: error\ndata: {json.dumps({'error': 'Job not found'})}\n\n"
+            return
+
+        payload = json.dumps(status)
+        if payload != last:
+            yield f"data: {payload}\n\n"
+            last = payload
+        if status.get("status") in TERMINAL_STATUSES:
+            # No further notification will come to pop it
+            _job_changed.pop(job_id, None)
+            return
+
+        if changed is None:
+            await asyncio.sleep(REDIS_STATUS_INTERVAL)
+            continue
+        try:
+            await asyncio.wait_for(changed.wait(), SSE_HEARTBEAT)
+        except asyncio.TimeoutError:
+            yield ": keepalive\n\n"
+
+
+@app.get("/api/status_stream/{job_id}")
+async def status_stream(job_id: str):
+    """Stream job status as server-sent events until the job settles"""
+    return StreamingResponse(
+        _status_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
 class AcceptInput(BaseModel):
     job_id: str
     domain: str
     accept: bool
 
 
-@app.post("/api/accept_extracted")
-async def accept_extracted(input_data: AcceptInput):
-    """Approve or reject queued extracted data. Non-blocking."""
-    job_id = input_data.job_id
-    domain = input_data.domain
+class AcceptBatchInput(BaseModel):
+    job_id: str
+    domains: List[str]
+    accept: bool
+
+
+def _save_approved(items: List[tuple]) -> Dict[str, str]:
+    """Save approved (domain, data) pairs in one transaction.
+
+    Runs on the worker thread's persistent connection; callers hold
+    _WRITE_LOCK. If the batch fails for any reason it is rolled back and
+    each domain is retried on its own, so one bad row doesn't fail the
+    rest. Returns {domain: error} for the domains that could not be saved.
+    """
+    try:
+        save_extracted_data_bulk(db_new.get_thread_conn(), items)
+        return {}
+    except Exception as e:
+        logging.warning(
+            f"Batch save of {len(items)} domains failed ({e}); retrying individually"
+        )
+
+    failures = {}
+    for domain, data in items:
+        try:
+            save_extracted_data(domain, data)
+        except Exception as e:
+            failures[domain] = str(e)
+    return failures
+
+
+# Approved saves are queued and committed in batches by _write_behind_loop
+WRITE_BATCH_SIZE = 64
+WRITE_BATCH_WINDOW = 0.2
+_write_q: asyncio.Queue = asyncio.Queue()
+
+
+def _maybe_complete(job_id: str) -> None:
+    job = processing_jobs[job_id]
+    if (
+        len(job["pending_approvals"]) == 0
+        and job["completed"] + job["failed"] >= job["total"]
+    ):
+        job["status"] = "completed"
+    _notify_job_changed(job_id)
+
+
+def _confirm_write(job_id: str, domain: str, data: dict, error: Optional[str]):
+    """Record the outcome of a write-behind save on its job."""
     if job_id not in processing_jobs:
-        raise HTTPException(status_code=404, detail="Job not found")
+        if REDIS_AVAILABLE:
+            if error:
+                get_redis_manager().add_log(
+                    job_id, "error", f"❌ Failed to save {domain}: {error}"
+                )
+            else:
+                get_redis_manager().add_log(
+                    job_id, "success", f"✅ Approved and saved {domain}"
+                )
+        return
+
+    from datetime import datetime
 
     job = processing_jobs[job_id]
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    if error:
+        job["failed"] += 1
+        _append_log(
+            job,
+            {
+                "timestamp": timestamp,
+                "level": "error",
+                "message": f"❌ Failed to save {domain}: {error}",
+            },
+        )
+    else:
+        job["approved_data"][domain] = data
+        job["completed"] += 1
+        _append_log(
+            job,
+            {
+                "timestamp": timestamp,
+                "level": "success",
+                "message": f"✅ Approved and saved {domain}",
+            },
+        )
+    _maybe_complete(job_id)
+
+
+async def _write_behind_loop():
+    """Drain _write_q in batches of up to WRITE_BATCH_SIZE / WRITE_BATCH_WINDOW."""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await _write_q.get()]
+        deadline = loop.time() + WRITE_BATCH_WINDOW
+        while len(batch) < WRITE_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_write_q.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        try:
+            async with _WRITE_LOCK:
+                failures = await asyncio.to_thread(
+                    _save_approved, [(domain, data) for _, domain, data in batch]
+                )
+        except Exception as e:
+            failures = {domain: str(e) for _, domain, _ in batch}
+
+        if REDIS_AVAILABLE and len(failures) < len(batch):
+            get_redis_manager().invalidate_stats()
 
-    if domain not in job.get("pending_approvals", {}):
+        for job_id, domain, data in batch:
+            _confirm_write(job_id, domain, data, failures.get(domain))
+            _write_q.task_done()
+
+
+async def _accept_in_process(job_id: str, domains: List[str], accept: bool) -> int:
+    """Resolve approvals for a job tracked in processing_jobs."""
+    job = processing_jobs[job_id]
+    pending = job.get("pending_approvals", {})
+
+    domains = list(dict.fromkeys(domains))
+    missing = [d for d in domains if d not in pending]
+    if missing:
         raise HTTPException(
-            status_code=404, detail=f"Domain {domain} not in pending approvals"
+            status_code=404,
+            detail=f"Domain {', '.join(missing)} not in pending approvals",
         )
 
     from datetime import datetime
 
     timestamp = datetime.now().strftime("%H:%M:%S")
+    items = [(d, pending.pop(d)) for d in domains]
 
-    if input_data.accept:
-        extracted_data = job["pending_approvals"].pop(domain)
-        try:
-            save_extracted_data(domain, extracted_data)
-            job["approved_data"][domain] = extracted_data
+    if accept:
+        # Counted as completed once _write_behind_loop confirms the commit
+        for domain, extracted_data in items:
+            await _write_q.put((job_id, domain, extracted_data))
+    else:
+        for domain, _ in items:
+            job["rejected_domains"].append(domain)
             job["completed"] += 1
-            job["logs"].append(
-                {
-                    "timestamp": timestamp,
-                    "level": "success",
-                    "message": f"✅ Approved and saved {domain}",
-                }
-            )
-        except Exception as e:
-            job["failed"] += 1
-            job["logs"].append(
+            _append_log(
+                job,
                 {
                     "timestamp": timestamp,
-                    "level": "error",
-                    "message": f"❌ Failed to save {domain}: {str(e)}",
-                }
+                    "level": "warning",
+                    "message": f"🚫 Rejected {domain}",
+                },
             )
-    else:
-        job["pending_approvals"].pop(domain)
-        job["rejected_domains"].append(domain)
-        job["completed"] += 1
-        job["logs"].append(
-            {
-                "timestamp": timestamp,
-                "level": "warning",
-                "message": f"🚫 Rejected {domain}",
-            }
+
+    drained = _drain_events.get(job_id)
+    if drained is not None and len(pending) < MAX_PENDING:
+        drained.set()
+
+    _maybe_complete(job_id)
+    return len(items)
+
+
+async def _accept_redis(job_id: str, domains: List[str], accept: bool) -> int:
+    """Resolve approvals for jobs queued to Redis workers with require_approval."""
+    redis_manager = get_redis_manager()
+
+    items = []
+    missing = []
+    for domain in dict.fromkeys(domains):
+        extracted_data = redis_manager.resolve_approval(job_id, domain, accept)
+        if extracted_data is None:
+            missing.append(domain)
+        else:
+            items.append((domain, extracted_data))
+    if missing and not items:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Domain {', '.join(missing)} not in pending approvals",
         )
 
-    if (
-        len(job["pending_approvals"]) == 0
-        and job["completed"] + job["failed"] >= job["total"]
-    ):
-        job["status"] = "completed"
+    for domain, extracted_data in items:
+        if accept:
+            await _write_q.put((job_id, domain, extracted_data))
+        else:
+            redis_manager.add_log(job_id, "warning", f"🚫 Rejected {domain}")
+    return len(items)
 
-    return {"job_id": job_id, "domain": domain, "accepted": input_data.accept}
 
+async def _accept(job_id: str, domains: List[str], accept: bool) -> int:
+    if job_id in processing_jobs:
+        return await _accept_in_process(job_id, domains, accept)
+    if REDIS_AVAILABLE:
+        return await _accept_redis(job_id, domains, accept)
+    raise HTTPException(status_code=404, detail="Job not found")
 
-@app.get("/api/companies")
-async def get_companies(limit: int = 50, offset: int = 0):
-    """Get all processed companies"""
-    conn = db_new.get_conn()
-    cursor = conn.cursor()
-
-    # Get company data with LEFT JOINs
-    query = """
-    SELECT DISTINCT
-        ci.domain,
-        comp.company_name,
-        di.industry,
-        di.long_description,
-        ci.phone,
-        ci.email,
-        ci.full_address,
-        sm.linkedin
-    FROM contact_information ci
-    LEFT JOIN company_information comp ON ci.domain = comp.domain
-    LEFT JOIN description_industry di ON ci.domain = di.domain
-    LEFT JOIN social_media sm ON ci.domain = sm.domain
-    ORDER BY ci.domain
-    LIMIT ? OFFSET ?
-    """
 
-    cursor.execute(query, (limit, offset))
-    rows = cursor.fetchall()
+@app.post("/api/accept_extracted", status_code=202)
+async def accept_extracted(input_data: AcceptInput):
+    """Approve or reject queued extracted data. Non-blocking.
 
-    companies = []
-    for row in rows:
-        domain = row[0]
+    Approved data is saved by the write-behind queue; the job's status
+    reflects the save once it is committed."""
+    await _accept(input_data.job_id, [input_data.domain], input_data.accept)
+    return {
+        "job_id": input_data.job_id,
+        "domain": input_data.domain,
+        "accepted": input_data.accept,
+    }
 
-        # Get certifications
-        cursor.execute(
-            "SELECT certification FROM certifications WHERE domain = ?", (domain,)
-        )
-        certs = [r[0] for r in cursor.fetchall()]
 
-        # Get services
-        cursor.execute("SELECT item_name FROM services WHERE domain = ?", (domain,))
-        services = [r[0] for r in cursor.fetchall()]
+@app.post("/api/accept_extracted_batch", status_code=202)
+async def accept_extracted_batch(input_data: AcceptBatchInput):
+    """Approve or reject many queued domains at once; approvals share one commit."""
+    queued = await _accept(input_data.job_id, input_data.domains, input_data.accept)
+    return {
+        "job_id": input_data.job_id,
+        "domains": input_data.domains,
+        "accepted": input_data.accept,
+        "count": queued,
+    }
 
-        companies.append(
+
+# One statement per page: certifications/services are folded in with
+# GROUP_CONCAT instead of two extra queries per company.
+LIST_SEP = "\x1f"
+
+COMPANIES_QUERY = f"""
+SELECT
+    ci.domain,
+    comp.company_name,
+    di.industry,
+    di.long_description,
+    ci.phone,
+    ci.email,
+    ci.full_address,
+    sm.linkedin,
+    (SELECT GROUP_CONCAT(certification, '{LIST_SEP}')
+       FROM certifications WHERE domain = ci.domain),
+    (SELECT GROUP_CONCAT(item_name, '{LIST_SEP}')
+       FROM services WHERE domain = ci.domain)
+FROM contact_information ci
+LEFT JOIN company_information comp ON ci.domain = comp.domain
+LEFT JOIN description_industry di ON ci.domain = di.domain
+LEFT JOIN social_media sm ON ci.domain = sm.domain
+GROUP BY ci.domain
+ORDER BY ci.domain
+LIMIT ? OFFSET ?
+"""
+
+
+def _split_list(value: Optional[str]) -> List[str]:
+    return value.split(LIST_SEP) if value else []
+
+
+def _fetch_companies(limit: int, offset: int) -> dict:
+    with _checkout() as conn:
+        cursor = conn.cursor()
+        cursor.execute(COMPANIES_QUERY, (limit, offset))
+        companies = [
             {
-                "domain": domain,
+                "domain": row[0],
                 "company_name": row[1],
                 "industry": row[2],
                 "description": row[3],
@@ -664,46 +1130,61 @@ async def get_companies(limit: int = 50, offset: int = 0):
                 "email": row[5],
                 "address": row[6],
                 "linkedin": row[7],
-                "certifications": certs,
-                "services": services,
+                "certifications": _split_list(row[8]),
+                "services": _split_list(row[9]),
             }
-        )
-
-    # Get total count
-    cursor.execute("SELECT COUNT(DISTINCT domain) FROM contact_information")
-    total = cursor.fetchone()[0]
+            for row in cursor.fetchall()
+        ]
 
-    conn.close()
+        # Get total count
+        cursor.execute("SELECT COUNT(DISTINCT domain) FROM contact_information")
+        total = cursor.fetchone()[0]
 
     return {"companies": companies, "total": total, "limit": limit, "offset": offset}
 
 
-@app.get("/api/stats")
-async def get_stats():
-    """Get database statistics"""
-    conn = db_new.get_conn()
-    cursor = conn.cursor()
-
-    tables = [
-        "contact_information",
-        "company_information",
-        "social_media",
-        "people_information",
-        "certifications",
-        "services",
-        "description_industry",
-    ]
+@app.get("/api/companies")
+async def get_companies(limit: int = 50, offset: int = 0):
+    """Get all processed companies"""
+    return await asyncio.to_thread(_fetch_companies, limit, offset)
+
+
+STATS_TABLES = [
+    "contact_information",
+    "company_information",
+    "social_media",
+    "people_information",
+    "certifications",
+    "services",
+    "description_industry",
+]
+
+
+def _fetch_stats() -> dict:
+    with _checkout() as conn:
+        cursor = conn.cursor()
+        stats = {}
+        for table in STATS_TABLES:
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            stats[table] = cursor.fetchone()[0]
+
+        # Get unique company count
+        cursor.execute("SELECT COUNT(DISTINCT domain) FROM contact_information")
+        stats["unique_companies"] = cursor.fetchone()[0]
+    return stats
 
-    stats = {}
-    for table in tables:
-        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-        stats[table] = cursor.fetchone()[0]
 
-    # Get unique company count
-    cursor.execute("SELECT COUNT(DISTINCT domain) FROM contact_information")
-    stats["unique_companies"] = cursor.fetchone()[0]
+@app.get("/api/stats")
+async def get_stats():
+    """Get database statistics (cached briefly in Redis when available)"""
+    if REDIS_AVAILABLE:
+        cached = get_redis_manager().get_cached_stats()
+        if cached:
+            return cached
 
-    conn.close()
+    stats = await asyncio.to_thread(_fetch_stats)
+    if REDIS_AVAILABLE:
+        get_redis_manager().cache_stats(stats)
     return stats
 
 
@@ -712,16 +1193,13 @@ async def get_graph_info():
     """Get LangGraph workflow information"""
     return {
         "nodes": [
-            {"id": "scrape", "label": "Scrape Website", "type": "process"},
-            {"id": "preprocess", "label": "Preprocess Content", "type": "process"},
+            {"id": "scrape", "label": "Scrape & Preprocess", "type": "process"},
             {"id": "extract", "label": "LLM Extract", "type": "llm"},
             {"id": "save", "label": "Save to DB", "type": "storage"},
         ],
         "edges": [
-            {"source": "scrape", "target": "preprocess", "label": "success"},
+            {"source": "scrape", "target": "extract", "label": "success"},
             {"source": "scrape", "target": "end", "label": "failed"},
-            {"source": "preprocess", "target": "extract", "label": "success"},
-            {"source": "preprocess", "target": "end", "label": "failed"},
             {"source": "extract", "target": "save", "label": "success"},
             {"source": "extract", "target": "end", "label": "failed"},
             {"source": "save", "target": "end", "label": "complete"},
@@ -764,99 +1242,111 @@ async def get_worker_stats():
     return stats
 
 
-@app.get("/api/companies_csv")
-async def get_companies_csv(limit: int = 500, offset: int = 0, mode: str = "download"):
-    """Return companies as CSV (download) or preview (JSON)"""
-    conn = db_new.get_conn()
-    cursor = conn.cursor()
-
-    # Base company data
-    query = """
-    SELECT DISTINCT
-        ci.domain,
-        comp.company_name,
-        di.industry,
-        di.long_description,
-        ci.phone,
-        ci.email,
-        ci.full_address,
-        sm.linkedin
-    FROM contact_information ci
-    LEFT JOIN company_information comp ON ci.domain = comp.domain
-    LEFT JOIN description_industry di ON ci.domain = di.domain
-    LEFT JOIN social_media sm ON ci.domain = sm.domain
-    ORDER BY ci.domain
-    LIMIT ? OFFSET ?
-    """
-
-    cursor.execute(query, (limit, offset))
-    rows = cursor.fetchall()
-
-    data_rows = []
-    headers = [
-        "domain",
-        "company_name",
-        "industry",
-        "description",
-        "phone",
-        "email",
-        "address",
-        "linkedin",
-        "certifications",
-        "services",
+CSV_HEADERS = [
+    "domain",
+    "company_name",
+    "industry",
+    "description",
+    "phone",
+    "email",
+    "address",
+    "linkedin",
+    "certifications",
+    "services",
+]
+CSV_FETCH_SIZE = 500
+
+
+def _csv_row(row) -> list:
+    # Certifications and services as pipe-delimited lists
+    return [
+        *row[:8],
+        " | ".join(_split_list(row[8])),
+        " | ".join(_split_list(row[9])),
     ]
 
-    for row in rows:
-        domain = row[0]
 
-        # Certifications and services as pipe-delimited lists
-        cursor.execute(
-            "SELECT certification FROM certifications WHERE domain = ?", (domain,)
-        )
-        certs = [r[0] for r in cursor.fetchall()]
+def _fetch_company_rows(limit: int, offset: int) -> list:
+    with _checkout() as conn:
+        return conn.execute(COMPANIES_QUERY, (limit, offset)).fetchall()
 
-        cursor.execute("SELECT item_name FROM services WHERE domain = ?", (domain,))
-        services = [r[0] for r in cursor.fetchall()]
 
-        data_rows.append(
-            {
-                "domain": domain,
-                "company_name": row[1],
-                "industry": row[2],
-                "description": row[3],
-                "phone": row[4],
-                "email": row[5],
-                "address": row[6],
-                "linkedin": row[7],
-                "certifications": " | ".join(certs),
-                "services": " | ".join(services),
-            }
-        )
+def _iter_companies_csv(limit: int, offset: int):
+    """Yield the CSV export a batch of rows at a time.
 
-    conn.close()
+    StreamingResponse runs this sync generator in its threadpool, so the
+    cursor is read off the event loop and the full file is never built.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADERS)
 
+    with _checkout() as conn:
+        cursor = conn.execute(COMPANIES_QUERY, (limit, offset))
+        while True:
+            rows = cursor.fetchmany(CSV_FETCH_SIZE)
+            if not rows:
+                break
+            writer.writerows(_csv_row(row) for row in rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@app.get("/api/companies_csv")
+async def get_companies_csv(limit: int = 500, offset: int = 0, mode: str = "download"):
+    """Return companies as CSV (download) or preview (JSON)"""
     if mode == "preview":
         # Return JSON for UI table preview
+        rows = await asyncio.to_thread(_fetch_company_rows, limit, offset)
         return {
-            "headers": headers,
-            "rows": [[row[h] for h in headers] for row in data_rows],
+            "headers": CSV_HEADERS,
+            "rows": [_csv_row(row) for row in rows],
         }
 
     # Default: CSV download
-    buffer = io.StringIO()
-    writer = csv.DictWriter(buffer, fieldnames=headers)
-    writer.writeheader()
-    writer.writerows(data_rows)
-    csv_bytes = buffer.getvalue()
-
-    return Response(
-        content=csv_bytes,
+    return StreamingResponse(
+        _iter_companies_csv(limit, offset),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=companies_export.csv"},
     )
 
 
+def _server_options() -> dict:
+    """uvloop/httptools when installed, and several workers when job state is shared.
+
+    In-process jobs live in one worker's memory, so without Redis a single
+    worker keeps /api/status consistent.
+    """
+    try:
+        import uvloop  # noqa: F401
+
+        loop = "uvloop"
+    except ImportError:  # pragma: no cover
+        loop = "asyncio"
+    try:
+        import httptools  # noqa: F401
+
+        http = "httptools"
+    except ImportError:  # pragma: no cover
+        http = "h11"
+
+    workers = 1
+    if REDIS_AVAILABLE:
+        workers = int(os.environ.get("API_WORKERS", max(2, (os.cpu_count() or 2) // 2)))
+    return {"loop": loop, "http": http, "workers": workers}
+
+
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    uvicorn.run(
+        "api_server:app",
+        host="0.0.0.0",
+        port=8000,
+        log_level="info",
+        **_server_options(),
+    )
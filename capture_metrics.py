@@ -11,10 +11,13 @@ from tabulate import tabulate
 API_BASE = "http://localhost:8000"
 
 
-def fetch_metrics(job_id: str) -> dict:
-    """Fetch job metrics from API"""
+def fetch_metrics(job_id: str, since: int = None) -> dict:
+    """Fetch job metrics from API; with since, only what changed after that log seq"""
     try:
-        response = requests.get(f"{API_BASE}/api/status/{job_id}")
+        response = requests.get(
+            f"{API_BASE}/api/status/{job_id}",
+            params={"since": since} if since is not None else None,
+        )
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -22,39 +25,75 @@ def fetch_metrics(job_id: str) -> dict:
         return None
 
 
+def stream_status(job_id: str, timeout: int):
+    """Yield status updates from the API's server-sent event stream"""
+    with requests.get(
+        f"{API_BASE}/api/status_stream/{job_id}",
+        stream=True,
+        timeout=(5, timeout),
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if line and line.startswith("data: "):
+                yield json.loads(line[len("data: ") :])
+
+
+def print_status(metrics: dict, last_status: str) -> str:
+    """Print a one-line progress summary if it changed; returns the line"""
+    status = metrics.get("status", "unknown")
+    current = metrics.get("current_domain", "")
+    pending = metrics.get("pending_count", 0)
+    completed = metrics.get("completed", 0)
+    failed = metrics.get("failed", 0)
+
+    status_line = f"[{status.upper()}] Completed: {completed} | Failed: {failed} | Pending: {pending}"
+    if current:
+        status_line += f" | Current: {current}"
+
+    if status_line != last_status:
+        print(f"  {status_line}")
+    return status_line
+
+
 def wait_for_completion(job_id: str, timeout: int = 1200) -> dict:
-    """Poll until job is complete"""
+    """Follow the status stream until the job is complete, polling if it's unavailable"""
     print(f"\n⏳ Waiting for job {job_id[:8]}... to complete (max {timeout}s)")
     print("-" * 80)
 
     start = time.time()
     last_status = ""
 
+    try:
+        for metrics in stream_status(job_id, timeout):
+            last_status = print_status(metrics, last_status)
+            if metrics.get("status") == "waiting_approval":
+                print(f"\n✅ Processing complete!")
+                return metrics
+            if time.time() - start >= timeout:
+                break
+    except requests.RequestException as e:
+        print(f"  (status stream unavailable: {e}; polling instead)")
+
+    # Poll with backoff: quick while things change, slower when idle.
+    # Each poll asks only for log entries newer than the last one seen.
+    delay = 1.0
+    since = 0
     while time.time() - start < timeout:
-        metrics = fetch_metrics(job_id)
+        metrics = fetch_metrics(job_id, since)
         if not metrics:
             time.sleep(2)
             continue
+        since = metrics.get("last_seq", since)
 
-        status = metrics.get("status", "unknown")
-        current = metrics.get("current_domain", "")
-        pending = metrics.get("pending_count", 0)
-        completed = metrics.get("completed", 0)
-        failed = metrics.get("failed", 0)
-
-        status_line = f"[{status.upper()}] Completed: {completed} | Failed: {failed} | Pending: {pending}"
-        if current:
-            status_line += f" | Current: {current}"
-
-        if status_line != last_status:
-            print(f"  {status_line}")
-            last_status = status_line
+        status_line = print_status(metrics, last_status)
+        delay = 1.0 if status_line != last_status else min(delay * 1.5, 5.0)
+        last_status = status_line
 
-        if status == "waiting_approval":
+        if metrics.get("status") == "waiting_approval":
             print(f"\n✅ Processing complete!")
             return metrics
 
-        time.sleep(1)
+        time.sleep(delay)
 
     print(f"\n❌ Timeout after {timeout}s")
     return fetch_metrics(job_id)
@@ -1,20 +1,172 @@
+import atexit
+import os
 import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional, Union
 
-DB_PATH = Path(__file__).resolve().parent / "db.sqlite"
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
 
+DB_PATH = Path(__file__).resolve().parent / "db.sqlite"
 
-def get_conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
+_local = threading.local()
+
+
+# Applied to every connection; journal_mode=WAL is persistent and set in init_db.
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Matches CURRENT_TIMESTAMP, so bound timestamps compare with column defaults
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Per-connection prepared-statement cache; room for every module constant
+# plus the ad-hoc queries callers run on the same connection.
+CACHED_STATEMENTS = 256
+
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def pack_text(text: str) -> Union[bytes, str]:
+    """Compress scraped text for raw_scrapes.clean_text (zstd, else zlib).
+
+    Empty text is stored as-is.
+    """
+    if not text:
+        return text
+    data = text.encode("utf-8")
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return zlib.compress(data)
+
+
+def unpack_text(value: Union[bytes, str, None]) -> Optional[str]:
+    """Inverse of pack_text; TEXT values from before compression pass through."""
+    if not isinstance(value, bytes):
+        return value
+    if value.startswith(_ZSTD_MAGIC):
+        return zstandard.ZstdDecompressor().decompress(value).decode("utf-8")
+    return zlib.decompress(value).decode("utf-8")
+
+
+def unpack_text_prefix(
+    value: Union[bytes, str, None], limit: int
+) -> Optional[str]:
+    """unpack_text, but stopping after `limit` decompressed bytes.
+
+    Legacy TEXT values are cut to `limit` chars; a UTF-8 character split by
+    the cut is dropped rather than raising.
+    """
+    if not isinstance(value, bytes):
+        return value if value is None else value[:limit]
+    if value.startswith(_ZSTD_MAGIC):
+        with zstandard.ZstdDecompressor().stream_reader(value) as reader:
+            data = reader.read(limit)
+    else:
+        data = zlib.decompressobj().decompress(value, limit)
+    return data.decode("utf-8", "ignore")
+
+
+class _Connection(sqlite3.Connection):
+    """Connection that refreshes the query planner's statistics on close."""
+
+    def close(self) -> None:
+        try:
+            # Cheap unless tables changed enough to need re-analysis
+            self.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass  # already closed, or query_only
+        super().close()
+
+
+def get_conn(
+    db_path: Optional[Path] = None, read_only: bool = False
+) -> sqlite3.Connection:
+    """Open a tuned connection to `db_path` (the agent DB by default).
+
+    read_only connections may be shared across threads and reject writes.
+    """
+    conn = sqlite3.connect(
+        db_path or DB_PATH,
+        check_same_thread=not read_only,
+        factory=_Connection,
+        cached_statements=CACHED_STATEMENTS,
+    )
     conn.row_factory = sqlite3.Row
+    # Lets queries hand back raw_scrapes.clean_text already decompressed
+    conn.create_function("unpack_text", 1, unpack_text, deterministic=True)
+    conn.create_function(
+        "unpack_text_prefix", 2, unpack_text_prefix, deterministic=True
+    )
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    if read_only:
+        conn.execute("PRAGMA query_only=1")
     return conn
 
 
+def get_thread_conn() -> sqlite3.Connection:
+    """Return this thread's long-lived connection, opening it on first use.
+
+    Callers own the transaction (commit/rollback) and must not close it.
+    A connection inherited across fork() is never reused; the child opens
+    its own.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.pid != os.getpid():
+        conn = get_conn()
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+
+@atexit.register
+def close_thread_conn() -> None:
+    """Close the calling thread's cached connection, if it has one.
+
+    Registered for the main thread at exit; other threads' connections are
+    released when the thread ends.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.pid == os.getpid():
+        conn.close()
+    _local.conn = None
+
+
+@contextmanager
+def _use_conn(
+    conn: Optional[sqlite3.Connection] = None,
+) -> Iterator[sqlite3.Connection]:
+    """Yield `conn` untouched (caller commits), or this thread's cached
+    connection inside a transaction that commits on exit.
+
+    Reusing the thread's connection spares every helper call a connect and
+    the PRAGMA setup.
+    """
+    if conn is not None:
+        yield conn
+        return
+    thread_conn = get_thread_conn()
+    with thread_conn:
+        yield thread_conn
+
+
 def init_db() -> None:
     """Initialize all tables matching the Excel template structure."""
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with get_conn() as conn:
+    with _use_conn() as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
         conn.executescript(
             """
             CREATE TABLE IF NOT EXISTS raw_scrapes (
@@ -119,229 +271,369 @@ def init_db() -> None:
                 error_msg TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             );
+
+            -- Memoized LLM responses, keyed by a hash of model, settings,
+            -- output schema and prompt; expired by prune_llm_cache
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key BLOB PRIMARY KEY,
+                response TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) WITHOUT ROWID;
+
+            -- Indexes: the worker's READY queue and per-domain lookups
+            CREATE INDEX IF NOT EXISTS idx_raw_status_created
+                ON raw_scrapes(status, created_at);
+            CREATE INDEX IF NOT EXISTS idx_contact_information_domain
+                ON contact_information(domain);
+            CREATE INDEX IF NOT EXISTS idx_people_information_domain
+                ON people_information(domain);
+            CREATE INDEX IF NOT EXISTS idx_certifications_domain
+                ON certifications(domain);
+            CREATE INDEX IF NOT EXISTS idx_services_domain
+                ON services(domain);
+            CREATE INDEX IF NOT EXISTS idx_metrics_domain
+                ON metrics(domain);
+            CREATE INDEX IF NOT EXISTS idx_llm_cache_created
+                ON llm_cache(created_at);
             """
         )
 
 
+def utc_timestamp() -> str:
+    """Current UTC time in SQLite's CURRENT_TIMESTAMP format."""
+    return datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+
+# raw_scrapes queue statements. Each helper passes the same string object,
+# so on a reused connection the statement is prepared once and then served
+# from the cache. clean_text is stored packed (see pack_text) and read back
+# through unpack_text, so callers only ever see str.
+UPSERT_RAW_SQL = """
+    INSERT INTO raw_scrapes(
+        domain, snapshot_path, clean_text, tech_stack, status, updated_at
+    )
+    VALUES(?,?,?,?,?,?)
+    ON CONFLICT(domain) DO UPDATE SET
+        snapshot_path=excluded.snapshot_path,
+        clean_text=excluded.clean_text,
+        tech_stack=excluded.tech_stack,
+        status=excluded.status,
+        updated_at=excluded.updated_at
+"""
+FETCH_PENDING_RAW_SQL = """
+    SELECT domain, unpack_text(clean_text) AS clean_text, tech_stack
+    FROM raw_scrapes WHERE status='READY'
+    ORDER BY created_at LIMIT ?
+"""
+UPDATE_RAW_STATUS_SQL = """
+    UPDATE raw_scrapes SET status=?, updated_at=? WHERE domain=?
+"""
+CLAIM_PENDING_RAW_SQL = """
+    UPDATE raw_scrapes
+    SET status='PROCESSING', updated_at=?
+    WHERE domain IN (
+        SELECT domain FROM raw_scrapes
+        WHERE status='READY'
+        ORDER BY created_at LIMIT ?
+    )
+    RETURNING domain, unpack_text_prefix(clean_text, ?) AS clean_text, tech_stack
+"""
+# Workers only ever prompt with the first MAX_TEXT_LENGTH (8000) chars of a
+# page; claiming a prefix with headroom for whitespace collapsing means the
+# rest is never decompressed, decoded or copied into Python
+CLAIM_TEXT_BYTES = 20_000
+
+
 def upsert_raw_scrape(
     domain: str,
     snapshot_path: str,
     clean_text: str,
     tech_stack_json: str,
     status: str = "READY",
+    conn: Optional[sqlite3.Connection] = None,
 ) -> None:
-    with get_conn() as conn:
+    with _use_conn(conn) as conn:
         conn.execute(
-            """
-            INSERT INTO raw_scrapes(domain, snapshot_path, clean_text, tech_stack, status)
-            VALUES(?,?,?,?,?)
-            ON CONFLICT(domain) DO UPDATE SET
-                snapshot_path=excluded.snapshot_path,
-                clean_text=excluded.clean_text,
-                tech_stack=excluded.tech_stack,
-                status=excluded.status,
-                updated_at=CURRENT_TIMESTAMP;
-            """,
-            (domain, snapshot_path, clean_text, tech_stack_json, status),
+            UPSERT_RAW_SQL,
+            (
+                domain,
+                snapshot_path,
+                pack_text(clean_text),
+                tech_stack_json,
+                status,
+                utc_timestamp(),
+            ),
         )
 
 
+def upsert_raw_scrape_many(
+    rows: list[tuple], conn: Optional[sqlite3.Connection] = None
+) -> None:
+    """Upsert (domain, snapshot_path, clean_text, tech_stack_json, status) rows
+    with one executemany in a single BEGIN IMMEDIATE ... COMMIT."""
+    if not rows:
+        return
+    with _use_conn(conn) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # One timestamp for the whole batch
+            now = utc_timestamp()
+            conn.executemany(
+                UPSERT_RAW_SQL,
+                [
+                    (domain, snapshot_path, pack_text(clean_text), tech, status, now)
+                    for domain, snapshot_path, clean_text, tech, status in rows
+                ],
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
 def fetch_pending_raw(limit: int = 10) -> list[sqlite3.Row]:
-    with get_conn() as conn:
-        return conn.execute(
-            """
-            SELECT domain, clean_text, tech_stack
-            FROM raw_scrapes WHERE status='READY'
-            ORDER BY created_at LIMIT ?;
-            """,
-            (limit,),
-        ).fetchall()
+    with _use_conn() as conn:
+        return conn.execute(FETCH_PENDING_RAW_SQL, (limit,)).fetchall()
 
 
 def update_raw_status(domain: str, status: str) -> None:
-    with get_conn() as conn:
-        conn.execute(
-            """
-            UPDATE raw_scrapes SET status=?, updated_at=CURRENT_TIMESTAMP WHERE domain=?;
-            """,
-            (status, domain),
-        )
+    with _use_conn() as conn:
+        conn.execute(UPDATE_RAW_STATUS_SQL, (status, utc_timestamp(), domain))
 
 
 def claim_pending_raw(worker_id: str, limit: int = 1) -> list[sqlite3.Row]:
-    """Atomically claim pending domains for processing by a specific worker."""
-    conn = get_conn()
-    try:
-        # Start transaction
-        conn.execute("BEGIN IMMEDIATE")
+    """Atomically claim pending domains for processing by a specific worker.
 
-        # Find READY domains
-        cur = conn.execute(
-            """
-            SELECT domain, clean_text, tech_stack 
-            FROM raw_scrapes 
-            WHERE status='READY' 
-            LIMIT ?
-            """,
-            (limit,),
+    One UPDATE ... RETURNING (SQLite 3.35+) picks the oldest READY rows and
+    marks them PROCESSING, so no other worker can claim them in between.
+    Only the first CLAIM_TEXT_BYTES of each clean_text are returned.
+    """
+    with _use_conn() as conn:
+        return conn.execute(
+            CLAIM_PENDING_RAW_SQL, (utc_timestamp(), limit, CLAIM_TEXT_BYTES)
+        ).fetchall()
+
+
+# contact_information columns after domain, in the order contact_row packs them
+_CONTACT_KEYS = (
+    "text",
+    "company_name",
+    "full_address",
+    "phone",
+    "sales_phone",
+    "fax",
+    "mobile",
+    "other_numbers",
+    "email",
+    "hours_of_operation",
+    "hq_indicator",
+)
+
+# Profile INSERTs, shared by the single-domain helpers and insert_rows so the
+# per-connection statement cache sees the same SQL text every time.
+INSERT_SQL = {
+    "contact_information": f"""
+        INSERT INTO contact_information (domain, {", ".join(_CONTACT_KEYS)})
+        VALUES ({", ".join("?" * (len(_CONTACT_KEYS) + 1))})
+    """,
+    "company_information": """
+        INSERT OR REPLACE INTO company_information (domain, company_name, acronym, logo_url)
+        VALUES (?, ?, ?, ?)
+    """,
+    "social_media": """
+        INSERT OR REPLACE INTO social_media (
+            domain, linkedin, facebook, x, instagram, youtube, blog, articles
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    "people_information": """
+        INSERT INTO people_information (domain, people_name, people_title, people_email, url)
+        VALUES (?, ?, ?, ?, ?)
+    """,
+    "description_industry": """
+        INSERT OR REPLACE INTO description_industry (
+            domain, long_description, short_description, sic_code, sic_text,
+            sub_industry, industry, sector
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    "certifications": """
+        INSERT INTO certifications (domain, certification)
+        VALUES (?, ?)
+    """,
+    "services": """
+        INSERT INTO services (domain, item_name, item_type)
+        VALUES (?, ?, ?)
+    """,
+}
+
+
+def contact_row(domain: str, data: dict) -> tuple:
+    # Spelled out in _CONTACT_KEYS order: a literal tuple of .get calls is
+    # about 3x faster than (domain, *(data.get(k, "") for k in _CONTACT_KEYS))
+    return (
+        domain,
+        data.get("text", ""),
+        data.get("company_name", ""),
+        data.get("full_address", ""),
+        data.get("phone", ""),
+        data.get("sales_phone", ""),
+        data.get("fax", ""),
+        data.get("mobile", ""),
+        data.get("other_numbers", ""),
+        data.get("email", ""),
+        data.get("hours_of_operation", ""),
+        data.get("hq_indicator", ""),
+    )
+
+
+def company_row(domain: str, data: dict) -> tuple:
+    return (
+        domain,
+        data.get("company_name", ""),
+        data.get("acronym", ""),
+        data.get("logo_url", ""),
+    )
+
+
+def social_row(domain: str, data: dict) -> tuple:
+    return (
+        domain,
+        data.get("linkedin", ""),
+        data.get("facebook", ""),
+        data.get("x", ""),
+        data.get("instagram", ""),
+        data.get("youtube", ""),
+        data.get("blog", ""),
+        data.get("articles", ""),
+    )
+
+
+def description_row(domain: str, data: dict) -> tuple:
+    return (
+        domain,
+        data.get("long_description", ""),
+        data.get("short_description", ""),
+        data.get("sic_code", ""),
+        data.get("sic_text", ""),
+        data.get("sub_industry", ""),
+        data.get("industry", ""),
+        data.get("sector", ""),
+    )
+
+
+def people_rows(domain: str, people_list: list) -> list[tuple]:
+    return [
+        (
+            domain,
+            person.get("name", ""),
+            person.get("title", ""),
+            person.get("email", ""),
+            person.get("url", ""),
         )
-        rows = cur.fetchall()
-
-        # Mark as PROCESSING
-        for row in rows:
-            conn.execute(
-                """
-                UPDATE raw_scrapes 
-                SET status='PROCESSING', updated_at=CURRENT_TIMESTAMP 
-                WHERE domain=? AND status='READY'
-                """,
-                (row["domain"],),
-            )
+        for person in people_list
+        if isinstance(person, dict)
+    ]
 
-        conn.commit()
-        return rows
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
 
+def certification_rows(domain: str, certs_list: list) -> list[tuple]:
+    return [(domain, str(cert)) for cert in certs_list if cert]
 
-def insert_contact_information(domain: str, data: dict) -> None:
+
+def service_rows(domain: str, items_list: list, item_type: str) -> list[tuple]:
+    return [(domain, str(item), item_type) for item in items_list if item]
+
+
+def insert_rows(
+    rows: dict[str, list[tuple]], conn: Optional[sqlite3.Connection] = None
+) -> None:
+    """executemany pre-built rows ({table: [params, ...]}), one statement per table."""
+    with _use_conn(conn) as conn:
+        for table, params in rows.items():
+            if params:
+                conn.executemany(INSERT_SQL[table], params)
+
+
+def save_domain_bundle(
+    bundle: dict[str, list[tuple]], conn: Optional[sqlite3.Connection] = None
+) -> None:
+    """Write pre-built rows for every table in one BEGIN IMMEDIATE ... COMMIT.
+
+    One commit (and fsync) per bundle instead of one per table.
+    """
+    with _use_conn(conn) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            insert_rows(bundle, conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def insert_contact_information(
+    domain: str, data: dict, conn: Optional[sqlite3.Connection] = None
+) -> None:
     """Insert into contact_information table."""
-    with get_conn() as conn:
-        conn.execute(
-            """
-            INSERT INTO contact_information (
-                domain, text, company_name, full_address, phone, sales_phone, 
-                fax, mobile, other_numbers, email, hours_of_operation, hq_indicator
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                domain,
-                data.get("text", ""),
-                data.get("company_name", ""),
-                data.get("full_address", ""),
-                data.get("phone", ""),
-                data.get("sales_phone", ""),
-                data.get("fax", ""),
-                data.get("mobile", ""),
-                data.get("other_numbers", ""),
-                data.get("email", ""),
-                data.get("hours_of_operation", ""),
-                data.get("hq_indicator", ""),
-            ),
-        )
+    with _use_conn(conn) as conn:
+        conn.execute(INSERT_SQL["contact_information"], contact_row(domain, data))
 
 
-def insert_company_information(domain: str, data: dict) -> None:
+def insert_company_information(
+    domain: str, data: dict, conn: Optional[sqlite3.Connection] = None
+) -> None:
     """Insert into company_information table."""
-    with get_conn() as conn:
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO company_information (domain, company_name, acronym, logo_url)
-            VALUES (?, ?, ?, ?)
-            """,
-            (
-                domain,
-                data.get("company_name", ""),
-                data.get("acronym", ""),
-                data.get("logo_url", ""),
-            ),
-        )
+    with _use_conn(conn) as conn:
+        conn.execute(INSERT_SQL["company_information"], company_row(domain, data))
 
 
-def insert_social_media(domain: str, data: dict) -> None:
+def insert_social_media(
+    domain: str, data: dict, conn: Optional[sqlite3.Connection] = None
+) -> None:
     """Insert into social_media table."""
-    with get_conn() as conn:
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO social_media (
-                domain, linkedin, facebook, x, instagram, youtube, blog, articles
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                domain,
-                data.get("linkedin", ""),
-                data.get("facebook", ""),
-                data.get("x", ""),
-                data.get("instagram", ""),
-                data.get("youtube", ""),
-                data.get("blog", ""),
-                data.get("articles", ""),
-            ),
-        )
+    with _use_conn(conn) as conn:
+        conn.execute(INSERT_SQL["social_media"], social_row(domain, data))
 
 
-def insert_people(domain: str, people_list: list) -> None:
+def insert_people(
+    domain: str, people_list: list, conn: Optional[sqlite3.Connection] = None
+) -> None:
     """Insert into people_information table."""
-    with get_conn() as conn:
-        for person in people_list:
-            if isinstance(person, dict):
-                conn.execute(
-                    """
-                    INSERT INTO people_information (domain, people_name, people_title, people_email, url)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (
-                        domain,
-                        person.get("name", ""),
-                        person.get("title", ""),
-                        person.get("email", ""),
-                        person.get("url", ""),
-                    ),
-                )
-
-
-def insert_description_industry(domain: str, data: dict) -> None:
+    with _use_conn(conn) as conn:
+        conn.executemany(INSERT_SQL["people_information"], people_rows(domain, people_list))
+
+
+def insert_description_industry(
+    domain: str, data: dict, conn: Optional[sqlite3.Connection] = None
+) -> None:
     """Insert into description_industry table."""
-    with get_conn() as conn:
+    with _use_conn(conn) as conn:
         conn.execute(
-            """
-            INSERT OR REPLACE INTO description_industry (
-                domain, long_description, short_description, sic_code, sic_text, 
-                sub_industry, industry, sector
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                domain,
-                data.get("long_description", ""),
-                data.get("short_description", ""),
-                data.get("sic_code", ""),
-                data.get("sic_text", ""),
-                data.get("sub_industry", ""),
-                data.get("industry", ""),
-                data.get("sector", ""),
-            ),
+            INSERT_SQL["description_industry"], description_row(domain, data)
         )
 
 
-def insert_certifications(domain: str, certs_list: list) -> None:
+def insert_certifications(
+    domain: str, certs_list: list, conn: Optional[sqlite3.Connection] = None
+) -> None:
     """Insert into certifications table."""
-    with get_conn() as conn:
-        for cert in certs_list:
-            if cert:
-                conn.execute(
-                    """
-                    INSERT INTO certifications (domain, certification)
-                    VALUES (?, ?)
-                    """,
-                    (domain, str(cert)),
-                )
-
-
-def insert_services(domain: str, items_list: list, item_type: str) -> None:
+    with _use_conn(conn) as conn:
+        conn.executemany(INSERT_SQL["certifications"], certification_rows(domain, certs_list))
+
+
+def insert_services(
+    domain: str,
+    items_list: list,
+    item_type: str,
+    conn: Optional[sqlite3.Connection] = None,
+) -> None:
     """Insert into services table."""
-    with get_conn() as conn:
-        for item in items_list:
-            if item:
-                conn.execute(
-                    """
-                    INSERT INTO services (domain, item_name, item_type)
-                    VALUES (?, ?, ?)
-                    """,
-                    (domain, str(item), item_type),
-                )
+    with _use_conn(conn) as conn:
+        conn.executemany(INSERT_SQL["services"], service_rows(domain, items_list, item_type))
+
+
+INSERT_METRIC_SQL = """
+    INSERT INTO metrics (domain, start_time, end_time, duration_seconds, success, error_msg)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
 
 
 def insert_metric(
@@ -353,16 +645,83 @@ def insert_metric(
     error_msg: Optional[str] = None,
 ) -> None:
     """Insert performance metric."""
-    with get_conn() as conn:
+    with _use_conn() as conn:
         conn.execute(
-            """
-            INSERT INTO metrics (domain, start_time, end_time, duration_seconds, success, error_msg)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
+            INSERT_METRIC_SQL,
             (domain, start_time, end_time, duration, success, error_msg),
         )
 
 
+# Cached answers older than this are neither served nor kept
+LLM_CACHE_TTL_DAYS = 30
+
+GET_LLM_CACHE_SQL = "SELECT response FROM llm_cache WHERE key=? AND created_at >= ?"
+PUT_LLM_CACHE_SQL = """
+    INSERT OR REPLACE INTO llm_cache(key, response, created_at) VALUES (?, ?, ?)
+"""
+PRUNE_LLM_CACHE_SQL = "DELETE FROM llm_cache WHERE created_at < ?"
+
+
+def _llm_cache_cutoff(max_age_days: float) -> str:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    return cutoff.strftime(TIMESTAMP_FORMAT)
+
+
+def get_cached_llm_response(key: bytes) -> Optional[str]:
+    """Return the memoized raw LLM response for `key`, if any and not expired."""
+    with _use_conn() as conn:
+        row = conn.execute(
+            GET_LLM_CACHE_SQL, (key, _llm_cache_cutoff(LLM_CACHE_TTL_DAYS))
+        ).fetchone()
+    return row[0] if row else None
+
+
+def cache_llm_response(key: bytes, response: str) -> None:
+    """Memoize a raw LLM response under `key`."""
+    with _use_conn() as conn:
+        conn.execute(PUT_LLM_CACHE_SQL, (key, response, utc_timestamp()))
+
+
+def prune_llm_cache(
+    max_age_days: float = LLM_CACHE_TTL_DAYS,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    """Delete llm_cache entries older than `max_age_days`; returns the count.
+
+    With an explicit `conn` the caller commits, as with the other helpers.
+    """
+    with _use_conn(conn) as conn:
+        cur = conn.execute(PRUNE_LLM_CACHE_SQL, (_llm_cache_cutoff(max_age_days),))
+    return cur.rowcount
+
+
+def save_processed_batch(
+    bundle: dict[str, list[tuple]],
+    statuses: list[tuple[str, str]],
+    metrics: list[tuple],
+    conn: Optional[sqlite3.Connection] = None,
+) -> None:
+    """Finish a batch of claimed domains in one BEGIN IMMEDIATE ... COMMIT.
+
+    Writes the profiles' pre-built rows, moves each domain's raw_scrapes
+    status ((status, domain) pairs) and records its INSERT_METRIC_SQL row.
+    """
+    now = utc_timestamp()
+    with _use_conn(conn) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            insert_rows(bundle, conn)
+            conn.executemany(
+                UPDATE_RAW_STATUS_SQL,
+                [(status, now, domain) for status, domain in statuses],
+            )
+            conn.executemany(INSERT_METRIC_SQL, metrics)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
 if __name__ == "__main__":
     init_db()
     print("Database initialized with all tables")
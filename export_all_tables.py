@@ -13,6 +13,34 @@ except ImportError:
     HAS_OPENPYXL = False
 
 
+EXPORT_FETCH_SIZE = 2048
+
+
+def _append_query(ws, cursor) -> int:
+    """Append the rows of `cursor` to `ws` a page at a time; returns the row count.
+
+    Rows must be plain tuples already in sheet column order. Pages of
+    EXPORT_FETCH_SIZE keep the working set small however big the table is.
+    """
+    cursor.arraysize = EXPORT_FETCH_SIZE
+    count = 0
+    while batch := cursor.fetchmany():
+        for r in batch:
+            ws.append(r)
+        count += len(batch)
+    return count
+
+
+def _write_query(writer, cursor) -> int:
+    """CSV counterpart of _append_query: writerows page by page, returns the count."""
+    cursor.arraysize = EXPORT_FETCH_SIZE
+    count = 0
+    while batch := cursor.fetchmany():
+        writer.writerows(batch)
+        count += len(batch)
+    return count
+
+
 def export_to_excel(output_file: str = "company_data_export.xlsx") -> None:
     """Export description_industry to separate file; other tables to single file."""
 
@@ -27,11 +55,15 @@ def export_to_excel(output_file: str = "company_data_export.xlsx") -> None:
     output_dir.mkdir(exist_ok=True)
 
     conn = get_conn()
+    # Plain tuples go straight into ws.append with no per-column lookups
+    conn.row_factory = None
+
+    # Write-only workbooks stream rows out instead of keeping every cell in
+    # memory, and the cursors below are paged rather than fetchall()ed.
 
     # --- SEPARATE FILE 1: description_industry ---
-    wb_desc = Workbook()
-    ws_desc = wb_desc.active
-    ws_desc.title = "description_industry"
+    wb_desc = Workbook(write_only=True)
+    ws_desc = wb_desc.create_sheet(title="description_industry")
     desc_cols = [
         "domain",
         "sub_industry",
@@ -41,27 +73,18 @@ def export_to_excel(output_file: str = "company_data_export.xlsx") -> None:
         "sic_description",
     ]
     ws_desc.append(desc_cols)
-    desc_rows = conn.execute(
-        "SELECT domain, sub_industry, industry, sector, sic_code, sic_text FROM description_industry ORDER BY domain"
-    ).fetchall()
-    for r in desc_rows:
-        ws_desc.append(
-            [
-                r["domain"],
-                r["sub_industry"],
-                r["industry"],
-                r["sector"],
-                r["sic_code"],
-                r["sic_text"],
-            ]
-        )
+    desc_count = _append_query(
+        ws_desc,
+        conn.execute(
+            "SELECT domain, sub_industry, industry, sector, sic_code, sic_text FROM description_industry ORDER BY domain"
+        ),
+    )
     desc_path = output_dir / "description_industry.xlsx"
     wb_desc.save(desc_path.as_posix())
-    print(f"✓ description_industry.xlsx: {len(desc_rows)} rows -> {desc_path}")
+    print(f"✓ description_industry.xlsx: {desc_count} rows -> {desc_path}")
 
     # --- COMBINED FILE 2: All other tables ---
-    wb = Workbook()
-    wb.remove(wb.active)  # Remove default sheet
+    wb = Workbook(write_only=True)
 
     # 1. Contact Information sheet
     ws_contact = wb.create_sheet(title="contact_information")
@@ -80,23 +103,21 @@ def export_to_excel(output_file: str = "company_data_export.xlsx") -> None:
         "hq_indicator",
     ]
     ws_contact.append(contact_cols)
-    contact_rows = conn.execute(
-        f"SELECT {', '.join(contact_cols)} FROM contact_information"
-    ).fetchall()
-    for r in contact_rows:
-        ws_contact.append([r[c] for c in contact_cols])
-    print(f"✓ contact_information: {len(contact_rows)} rows")
+    contact_count = _append_query(
+        ws_contact,
+        conn.execute(f"SELECT {', '.join(contact_cols)} FROM contact_information"),
+    )
+    print(f"✓ contact_information: {contact_count} rows")
 
     # 2. Company Information sheet
     ws_company = wb.create_sheet(title="company_information")
     company_cols = ["domain", "company_name", "acronym", "logo_url"]
     ws_company.append(company_cols)
-    company_rows = conn.execute(
-        f"SELECT {', '.join(company_cols)} FROM company_information"
-    ).fetchall()
-    for r in company_rows:
-        ws_company.append([r[c] for c in company_cols])
-    print(f"✓ company_information: {len(company_rows)} rows")
+    company_count = _append_query(
+        ws_company,
+        conn.execute(f"SELECT {', '.join(company_cols)} FROM company_information"),
+    )
+    print(f"✓ company_information: {company_count} rows")
 
     # 3. Social Media sheet
     ws_social = wb.create_sheet(title="social_media")
@@ -111,45 +132,41 @@ def export_to_excel(output_file: str = "company_data_export.xlsx") -> None:
         "articles",
     ]
     ws_social.append(social_cols)
-    social_rows = conn.execute(
-        f"SELECT {', '.join(social_cols)} FROM social_media"
-    ).fetchall()
-    for r in social_rows:
-        ws_social.append([r[c] for c in social_cols])
-    print(f"✓ social_media: {len(social_rows)} rows")
+    social_count = _append_query(
+        ws_social,
+        conn.execute(f"SELECT {', '.join(social_cols)} FROM social_media"),
+    )
+    print(f"✓ social_media: {social_count} rows")
 
     # 4. People Information sheet
     ws_people = wb.create_sheet(title="people_information")
     people_cols = ["domain", "people_name", "people_title", "people_email", "url"]
     ws_people.append(people_cols)
-    people_rows = conn.execute(
-        f"SELECT {', '.join(people_cols)} FROM people_information"
-    ).fetchall()
-    for r in people_rows:
-        ws_people.append([r[c] for c in people_cols])
-    print(f"✓ people_information: {len(people_rows)} rows")
+    people_count = _append_query(
+        ws_people,
+        conn.execute(f"SELECT {', '.join(people_cols)} FROM people_information"),
+    )
+    print(f"✓ people_information: {people_count} rows")
 
     # 5. Certifications sheet
     ws_certs = wb.create_sheet(title="certifications")
     cert_cols = ["domain", "certification"]
     ws_certs.append(cert_cols)
-    cert_rows = conn.execute(
-        f"SELECT {', '.join(cert_cols)} FROM certifications"
-    ).fetchall()
-    for r in cert_rows:
-        ws_certs.append([r[c] for c in cert_cols])
-    print(f"✓ certifications: {len(cert_rows)} rows")
+    cert_count = _append_query(
+        ws_certs,
+        conn.execute(f"SELECT {', '.join(cert_cols)} FROM certifications"),
+    )
+    print(f"✓ certifications: {cert_count} rows")
 
     # 6. Services sheet
     ws_services = wb.create_sheet(title="services")
     service_cols = ["domain", "item_name", "item_type"]
     ws_services.append(service_cols)
-    service_rows = conn.execute(
-        f"SELECT {', '.join(service_cols)} FROM services"
-    ).fetchall()
-    for r in service_rows:
-        ws_services.append([r[c] for c in service_cols])
-    print(f"✓ services: {len(service_rows)} rows")
+    service_count = _append_query(
+        ws_services,
+        conn.execute(f"SELECT {', '.join(service_cols)} FROM services"),
+    )
+    print(f"✓ services: {service_count} rows")
 
     # Save combined workbook
     export_path = output_dir / output_file
@@ -157,12 +174,12 @@ def export_to_excel(output_file: str = "company_data_export.xlsx") -> None:
     conn.close()
 
     total = (
-        len(contact_rows)
-        + len(company_rows)
-        + len(social_rows)
-        + len(people_rows)
-        + len(cert_rows)
-        + len(service_rows)
+        contact_count
+        + company_count
+        + social_count
+        + people_count
+        + cert_count
+        + service_count
     )
     print(f"\n✓ company_data_export.xlsx: {total} rows -> {export_path}")
 
@@ -220,15 +237,19 @@ def export_to_csv() -> None:
         "services": ["domain", "item_name", "item_type"],
     }
 
+    # Tuple rows stream from the cursor straight into writerows a page at a
+    # time; the printed counts are the rows actually written
+    conn.row_factory = None
+
     for table_name, columns in tables.items():
-        rows = conn.execute(f"SELECT {', '.join(columns)} FROM {table_name}").fetchall()
         csv_path = output_dir / f"{table_name}.csv"
         with open(csv_path, "w", newline="", encoding="utf-8") as f:
             writer = csv.writer(f)
             writer.writerow(columns)
-            for r in rows:
-                writer.writerow([r[c] for c in columns])
-        print(f"✓ {table_name}.csv: {len(rows)} rows")
+            count = _write_query(
+                writer, conn.execute(f"SELECT {', '.join(columns)} FROM {table_name}")
+            )
+        print(f"✓ {table_name}.csv: {count} rows")
 
     conn.close()
     print(f"\n✓ CSV exports complete in: {output_dir}/")
@@ -2,11 +2,15 @@
 
 import csv
 import json
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 from scraper import scrape_domain
-from db_new import get_conn, upsert_raw_scrape
+from db_new import get_conn, upsert_raw_scrape_many
+
+
+RAW_FLUSH_EVERY = 25
+SCRAPE_WORKERS = 16
 
 
 def load_domains_from_csv(csv_file: str = "Topic1_Input_Records(in).csv") -> list[str]:
@@ -23,6 +27,9 @@ def load_domains_from_csv(csv_file: str = "Topic1_Input_Records(in).csv") -> lis
 
 def scrape_and_enqueue(domains: list[str], max_domains: int = None) -> None:
     """Scrape domains and add to database."""
+    # Each host is fetched once, so parallel fetches never hit the same
+    # site twice and no per-request politeness delay is needed
+    domains = list(dict.fromkeys(domains))
     if max_domains:
         domains = domains[:max_domains]
 
@@ -34,52 +41,48 @@ def scrape_and_enqueue(domains: list[str], max_domains: int = None) -> None:
     success = 0
     failed = 0
 
-    print(f"Starting scrape for {total} domains...\n")
-
-    for idx, domain in enumerate(domains, 1):
-        print(f"[{idx}/{total}] Scraping {domain}...", end=" ")
-
-        try:
-            snapshot_path, clean_text, tech_stack = scrape_domain(domain, snapshot_dir)
-
-            if clean_text:
-                upsert_raw_scrape(
-                    domain=domain,
-                    snapshot_path=snapshot_path,
-                    clean_text=clean_text,
-                    tech_stack_json=json.dumps(tech_stack),
-                    status="READY",
-                )
-                print(f"✓ OK ({len(clean_text)} chars)")
-                success += 1
-            else:
-                upsert_raw_scrape(
-                    domain=domain,
-                    snapshot_path="",
-                    clean_text="",
-                    tech_stack_json="[]",
-                    status="FAILED",
-                )
-                print("✗ No content")
-                failed += 1
-
-        except Exception as e:
-            print(f"✗ Error: {str(e)[:80]}")
-            failed += 1
-            try:
-                upsert_raw_scrape(
-                    domain=domain,
-                    snapshot_path="",
-                    clean_text="",
-                    tech_stack_json="[]",
-                    status="FAILED",
-                )
-            except Exception:
-                pass
-
-        # Small delay to be respectful
-        if idx < total:
-            time.sleep(0.5)
+    print(f"Starting scrape for {total} domains ({SCRAPE_WORKERS} at a time)...\n")
+
+    # Fetches run on SCRAPE_WORKERS threads; this thread is the only writer.
+    # Results are upserted RAW_FLUSH_EVERY at a time in one short
+    # transaction, so the write lock is never held across network fetches.
+    conn = get_conn()
+    pending = []
+    try:
+        with ThreadPoolExecutor(max_workers=SCRAPE_WORKERS) as pool:
+            futures = {
+                pool.submit(scrape_domain, domain, snapshot_dir): domain
+                for domain in domains
+            }
+            for idx, future in enumerate(as_completed(futures), 1):
+                domain = futures[future]
+                prefix = f"[{idx}/{total}] {domain}:"
+
+                try:
+                    snapshot_path, clean_text, tech_stack = future.result()
+
+                    if clean_text:
+                        pending.append(
+                            (domain, snapshot_path, clean_text, json.dumps(tech_stack), "READY")
+                        )
+                        print(f"{prefix} ✓ OK ({len(clean_text)} chars)")
+                        success += 1
+                    else:
+                        pending.append((domain, "", "", "[]", "FAILED"))
+                        print(f"{prefix} ✗ No content")
+                        failed += 1
+
+                except Exception as e:
+                    print(f"{prefix} ✗ Error: {str(e)[:80]}")
+                    failed += 1
+                    pending.append((domain, "", "", "[]", "FAILED"))
+
+                if len(pending) >= RAW_FLUSH_EVERY:
+                    upsert_raw_scrape_many(pending, conn)
+                    pending.clear()
+    finally:
+        upsert_raw_scrape_many(pending, conn)
+        conn.close()
 
     print(f"\n{'='*60}")
     print(f"Scraping complete!")
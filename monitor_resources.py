@@ -11,6 +11,11 @@ from datetime import datetime
 from pathlib import Path
 
 
+SAMPLE_INTERVAL = 1.0
+CSV_FLUSH_EVERY = 30
+CSV_FIELDS = ["timestamp", "cpu_percent", "memory_mb", "memory_percent"]
+
+
 def find_process(search_term: str):
     """Find process by name"""
     for proc in psutil.process_iter(["pid", "name"]):
@@ -42,16 +47,33 @@ def monitor_process(process_name: str, duration: int = 1200):
     # CSV output
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     csv_file = f"resource_usage_{timestamp}.csv"
-
-    metrics = []
-    start_time = time.time()
+    csv_out = open(csv_file, "w", newline="")
+    writer = csv.writer(csv_out)
+    writer.writerow(CSV_FIELDS)
+
+    # Samples are flushed to the CSV in batches; only running totals are
+    # kept for the summary, so memory stays flat however long this runs
+    batch = []
+    samples = 0
+    total_cpu = 0.0
+    total_mem = 0.0
     peak_cpu = 0
     peak_mem = 0
 
+    # Prime the counter: later interval=None calls return usage since the
+    # previous call without blocking
+    proc.cpu_percent(interval=None)
+    start_time = time.monotonic()
+    next_tick = start_time + SAMPLE_INTERVAL
+
     try:
-        while time.time() - start_time < duration:
+        while time.monotonic() - start_time < duration:
+            # Sleep to the next tick rather than a fixed second, so the time
+            # spent sampling and printing doesn't make the schedule drift
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+            next_tick += SAMPLE_INTERVAL
             try:
-                cpu_percent = proc.cpu_percent(interval=0.1)
+                cpu_percent = proc.cpu_percent(interval=None)
                 mem_info = proc.memory_info()
                 mem_mb = mem_info.rss / 1024 / 1024
                 mem_percent = proc.memory_percent()
@@ -61,20 +83,25 @@ def monitor_process(process_name: str, duration: int = 1200):
                     f"{timestamp_str:<20} {cpu_percent:<10.2f} {mem_mb:<15.2f} {mem_percent:<10.2f}"
                 )
 
-                metrics.append(
-                    {
-                        "timestamp": timestamp_str,
-                        "cpu_percent": round(cpu_percent, 2),
-                        "memory_mb": round(mem_mb, 2),
-                        "memory_percent": round(mem_percent, 2),
-                    }
+                # Tuples in CSV_FIELDS order; no per-sample dict
+                batch.append(
+                    (
+                        timestamp_str,
+                        round(cpu_percent, 2),
+                        round(mem_mb, 2),
+                        round(mem_percent, 2),
+                    )
                 )
+                if len(batch) >= CSV_FLUSH_EVERY:
+                    writer.writerows(batch)
+                    batch.clear()
 
+                samples += 1
+                total_cpu += cpu_percent
+                total_mem += mem_mb
                 peak_cpu = max(peak_cpu, cpu_percent)
                 peak_mem = max(peak_mem, mem_mb)
 
-                time.sleep(1)
-
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 print(f"\n⚠️  Process terminated or access denied")
                 break
@@ -82,28 +109,20 @@ def monitor_process(process_name: str, duration: int = 1200):
     except KeyboardInterrupt:
         print(f"\n\n⏹️  Monitoring stopped by user")
 
-    # Write CSV
-    if metrics:
-        with open(csv_file, "w", newline="") as f:
-            writer = csv.DictWriter(
-                f,
-                fieldnames=["timestamp", "cpu_percent", "memory_mb", "memory_percent"],
-            )
-            writer.writeheader()
-            writer.writerows(metrics)
+    finally:
+        writer.writerows(batch)
+        csv_out.close()
 
+    if samples:
         print("\n" + "=" * 80)
         print(f"📊 RESOURCE USAGE SUMMARY")
         print("=" * 80)
-        print(f"Duration: {len(metrics)} seconds ({len(metrics)/60:.1f} minutes)")
+        elapsed = samples * SAMPLE_INTERVAL
+        print(f"Duration: {elapsed:.0f} seconds ({elapsed/60:.1f} minutes)")
         print(f"Peak CPU: {peak_cpu:.2f}%")
         print(f"Peak Memory: {peak_mem:.2f} MB")
-
-        if metrics:
-            avg_cpu = sum(m["cpu_percent"] for m in metrics) / len(metrics)
-            avg_mem = sum(m["memory_mb"] for m in metrics) / len(metrics)
-            print(f"Avg CPU: {avg_cpu:.2f}%")
-            print(f"Avg Memory: {avg_mem:.2f} MB")
+        print(f"Avg CPU: {total_cpu / samples:.2f}%")
+        print(f"Avg Memory: {total_mem / samples:.2f} MB")
 
         print(f"\n💾 Data saved to: {csv_file}")
         print("=" * 80)
@@ -1,57 +1,116 @@
 import logging
-import multiprocessing
+import queue
+import sqlite3
+import threading
 import time
 from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
-from worker_new import process_once
-from db_new import get_conn
-
-# Configure logging for multi-worker
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - Worker-%(process)d - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("multi_worker.log"), logging.StreamHandler()],
+from worker_new import OLLAMA_HOST, OLLAMA_MODEL, process_once
+from db_new import (
+    close_thread_conn,
+    get_conn,
+    get_thread_conn,
+    init_db,
+    prune_llm_cache,
+    utc_timestamp,
 )
+
+LOG_FORMAT = "%(asctime)s - %(threadName)s - %(levelname)s - %(message)s"
 logger = logging.getLogger(__name__)
 
 
-def worker_process(worker_id: int, stop_event: multiprocessing.Event) -> None:
-    """Run a single worker process until the stop event is signaled."""
+# Idle workers back off exponentially between empty polls, and snap back
+# to the minimum as soon as they find work
+IDLE_SLEEP_MIN = 0.25
+IDLE_SLEEP_MAX = 30.0
+
+# Controller timing: it wakes when a worker goes idle (or every
+# CONTROL_POLL seconds) and releases stuck rows on a slower timer
+CONTROL_POLL = 5
+RELEASE_INTERVAL = 60
+
+# Every worker thread has its own connection to one database file: each waits
+# out another's write lock instead of failing after db_new's default
+BUSY_TIMEOUT_MS = 30000
+
+
+def start_log_listener() -> QueueListener:
+    """Route all logging through a queue drained by one background thread.
+
+    Worker threads only enqueue records; the root logger's existing handlers
+    (worker_new's worker.log and console) and a rotating multi_worker.log do
+    the writing on the listener's thread. Stop the listener to flush.
+    """
+    root = logging.getLogger()
+    handlers = root.handlers[:] or [logging.StreamHandler()]
+    file_handler = RotatingFileHandler(
+        "multi_worker.log", maxBytes=50_000_000, backupCount=5
+    )
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+
+    listener = QueueListener(
+        log_queue, *handlers, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    return listener
+
+
+def worker_process(
+    worker_id: int, stop_event: threading.Event, idle_event: threading.Event
+) -> None:
+    """Run a single worker thread until the stop event is signaled."""
     logger.info(f"Worker-{worker_id} started")
 
-    while not stop_event.is_set():
-        try:
-            processed = process_once()
-            if processed == 0:
-                time.sleep(2)
-        except KeyboardInterrupt:
-            logger.info(f"Worker-{worker_id} stopped by user")
-            break
-        except Exception as e:
-            logger.error(f"Worker-{worker_id} error: {str(e)[:100]}", exc_info=True)
-            time.sleep(2)
+    # process_once claims and saves through this thread's own connection
+    get_thread_conn().execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+
+    idle_sleep = IDLE_SLEEP_MIN
+    try:
+        while not stop_event.is_set():
+            try:
+                processed = process_once(stop_event)
+                if processed == 0:
+                    if idle_sleep == IDLE_SLEEP_MIN:
+                        idle_event.set()  # first empty poll since the last work
+                    # Wakes early if the controller signals stop
+                    stop_event.wait(idle_sleep)
+                    idle_sleep = min(idle_sleep * 2, IDLE_SLEEP_MAX)
+                else:
+                    idle_sleep = IDLE_SLEEP_MIN
+            except Exception as e:
+                logger.error(f"Worker-{worker_id} error: {str(e)[:100]}", exc_info=True)
+                stop_event.wait(2)
+    finally:
+        close_thread_conn()
 
     logger.info(f"Worker-{worker_id} exiting (stop signaled)")
 
 
-def is_queue_empty() -> bool:
+def is_queue_empty(conn: sqlite3.Connection) -> bool:
     """Return True when no READY or PROCESSING rows remain in raw_scrapes."""
-    conn = get_conn()
-    rows = conn.execute(
+    # Stops at the first matching entry of idx_raw_status_created (status
+    # is its leading column) instead of counting every READY/PROCESSING row
+    row = conn.execute(
         """
-        SELECT status, COUNT(1) AS cnt
-        FROM raw_scrapes
+        SELECT 1 FROM raw_scrapes
         WHERE status IN ('READY','PROCESSING')
-        GROUP BY status
+        LIMIT 1
         """
-    ).fetchall()
-    conn.close()
-    # If there are no rows matching READY/PROCESSING, queue is empty
-    return len(rows) == 0
+    ).fetchone()
+    return row is None
 
 
-def release_stuck_processing(timeout_seconds: int = 900) -> int:
+def release_stuck_processing(
+    conn: sqlite3.Connection, timeout_seconds: int = 900
+) -> int:
     """Reset rows stuck in PROCESSING beyond timeout back to READY.
 
     Returns the number of rows released. Uses UTC timestamps matching SQLite CURRENT_TIMESTAMP format.
@@ -59,17 +118,29 @@ def release_stuck_processing(timeout_seconds: int = 900) -> int:
     threshold = (datetime.utcnow() - timedelta(seconds=timeout_seconds)).strftime(
         "%Y-%m-%d %H:%M:%S"
     )
-    conn = get_conn()
+    # Read first: the UPDATE takes the write lock even when it matches
+    # nothing, and there usually is nothing stuck. Only the PROCESSING rows
+    # (via idx_raw_status_created) are looked at
+    stuck = conn.execute(
+        """
+        SELECT 1 FROM raw_scrapes
+        WHERE status='PROCESSING' AND updated_at < ?
+        LIMIT 1
+        """,
+        (threshold,),
+    ).fetchone()
+    if stuck is None:
+        return 0
+
     cur = conn.execute(
         """
         UPDATE raw_scrapes
-        SET status='READY', updated_at=CURRENT_TIMESTAMP
+        SET status='READY', updated_at=?
         WHERE status='PROCESSING' AND updated_at < ?
         """,
-        (threshold,),
+        (utc_timestamp(), threshold),
     )
     conn.commit()
-    conn.close()
     released = cur.rowcount if hasattr(cur, "rowcount") else 0
     if released:
         logger.info(
@@ -78,30 +149,76 @@ def release_stuck_processing(timeout_seconds: int = 900) -> int:
     return released
 
 
+def tick(conn: sqlite3.Connection, timeout_seconds: int = 900) -> tuple[int, bool]:
+    """One control-loop pass: release stuck rows, then check for remaining work.
+
+    Returns (released, empty). Rows just released are READY again, so the
+    emptiness query is only needed when nothing was released.
+    """
+    released = release_stuck_processing(conn, timeout_seconds)
+    return released, released == 0 and is_queue_empty(conn)
+
+
 def main():
-    """Launch 6 concurrent worker processes (1 per CPU core)."""
+    """Run 6 concurrent worker threads in this process.
+
+    Workers spend nearly all their time waiting on Ollama and SQLite, so
+    threads give the same concurrency as separate processes without paying
+    for six interpreters and their imports.
+    """
     num_workers = 6
+    listener = start_log_listener()
     logger.info(f"Starting {num_workers} concurrent workers...")
-    logger.info("Model: llama3.2:1b | Ollama: http://127.0.0.1:11434")
+    logger.info(f"Model: {OLLAMA_MODEL} | Ollama: {OLLAMA_HOST}")
     logger.info(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
-    stop_event = multiprocessing.Event()
+    # Creates any tables and indexes a DB made by an older version lacks
+    # (e.g. llm_cache) before a worker or the pruning below touches them
+    init_db()
+    close_thread_conn()
+
+    stop_event = threading.Event()
+    idle_event = threading.Event()
 
-    # Create worker processes
-    processes = []
+    # Create worker threads
+    threads = []
     for i in range(1, num_workers + 1):
-        p = multiprocessing.Process(target=worker_process, args=(i, stop_event))
-        p.start()
-        processes.append(p)
-        logger.info(f"Worker-{i} (PID: {p.pid}) launched")
+        t = threading.Thread(
+            target=worker_process,
+            args=(i, stop_event, idle_event),
+            name=f"Worker-{i}",
+            # A second Ctrl+C while joining exits at once; rows still claimed
+            # are put back to READY by release_stuck_processing next run
+            daemon=True,
+        )
+        t.start()
+        threads.append(t)
+        logger.info(f"Worker-{i} launched")
 
     logger.info(f"All {num_workers} workers running. Press Ctrl+C to stop.")
     logger.info("Logs saved to: worker.log, multi_worker.log")
 
+    # One control connection for the whole run, used only by this thread
+    ctl_conn = get_conn()
+    ctl_conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    last_release = float("-inf")
+
     try:
+        # Expired LLM answers are dropped once per run so llm_cache stays
+        # bounded; like a cache miss in extract_profile, failing is not fatal
+        try:
+            pruned = prune_llm_cache(conn=ctl_conn)
+            ctl_conn.commit()
+            if pruned:
+                logger.info(f"Pruned {pruned} expired LLM cache entries")
+        except sqlite3.Error as e:
+            ctl_conn.rollback()
+            logger.warning(f"LLM cache prune failed: {e}")
+
         # Monitor queue, release stuck PROCESSING items, and support manual STOP file
         while True:
-            time.sleep(5)
+            woke = idle_event.wait(CONTROL_POLL)
+            idle_event.clear()
 
             # Manual stop via sentinel file
             if Path("STOP").exists():
@@ -109,27 +226,37 @@ def main():
                 stop_event.set()
                 break
 
-            # Free up any stuck PROCESSING rows
-            release_stuck_processing(timeout_seconds=900)
+            # Free up stuck PROCESSING rows on the slow timer; otherwise only
+            # look at the queue when a worker has just gone idle
+            if time.monotonic() - last_release >= RELEASE_INTERVAL:
+                last_release = time.monotonic()
+                _, empty = tick(ctl_conn, timeout_seconds=900)
+            elif woke:
+                empty = is_queue_empty(ctl_conn)
+            else:
+                continue
 
             # Auto-stop when queue is empty
-            if is_queue_empty():
+            if empty:
                 logger.info("Queue empty (no READY/PROCESSING). Stopping workers...")
                 stop_event.set()
                 break
 
-        # Wait for all processes to exit
-        for p in processes:
-            p.join()
+        # Wait for all workers to exit
+        for t in threads:
+            t.join()
         logger.info("All workers stopped.")
     except KeyboardInterrupt:
+        # Workers finish the domain in flight, save, and claim nothing more
         logger.info("Stopping all workers (keyboard interrupt)...")
         stop_event.set()
-        for p in processes:
-            p.join()
+        for t in threads:
+            t.join()
         logger.info("All workers stopped.")
+    finally:
+        ctl_conn.close()
+        listener.stop()
 
 
 if __name__ == "__main__":
-    # Ensure the multiprocessing entrypoint is invoked on Windows
     main()
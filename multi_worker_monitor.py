@@ -11,6 +11,18 @@ from datetime import datetime
 from pathlib import Path
 from typing import List, Dict
 
+# Full process-table scans are only needed to pick up new workers
+RESCAN_INTERVAL = 30
+CSV_FLUSH_EVERY = 60
+CSV_FIELDS = [
+    "timestamp",
+    "worker_count",
+    "total_cpu_percent",
+    "total_memory_mb",
+    "avg_cpu_percent",
+    "avg_memory_mb",
+]
+
 
 def find_worker_processes() -> List[psutil.Process]:
     """Find all redis_worker.py processes"""
@@ -25,13 +37,28 @@ def find_worker_processes() -> List[psutil.Process]:
     return workers
 
 
+def track_workers(workers: Dict[int, psutil.Process]) -> None:
+    """Add newly started workers to the tracked set, keyed by PID.
+
+    Already-tracked Process objects are kept so cpu_percent() keeps
+    measuring against their previous call; new ones are primed."""
+    for proc in find_worker_processes():
+        if proc.pid not in workers:
+            try:
+                proc.cpu_percent(interval=None)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            workers[proc.pid] = proc
+
+
 def monitor_multi_workers(duration: int = 1200):
     """Monitor all Redis worker processes"""
 
     print(f"\n🔍 Searching for Redis worker processes...")
 
     # Initial scan
-    workers = find_worker_processes()
+    workers: Dict[int, psutil.Process] = {}
+    track_workers(workers)
 
     if not workers:
         print("❌ No Redis worker processes found")
@@ -39,8 +66,8 @@ def monitor_multi_workers(duration: int = 1200):
         sys.exit(1)
 
     print(f"✅ Found {len(workers)} worker process(es):")
-    for w in workers:
-        print(f"  - PID {w.pid}: {' '.join(w.cmdline()[-2:])}")
+    for w in workers.values():
+        print(f"  - PID {w.pid}: {' '.join(w.info['cmdline'][-2:])}")
 
     print(f"\n⏱️  Monitoring for {duration}s (max)")
     print("📊 Tracking aggregate metrics across all workers\n")
@@ -53,39 +80,59 @@ def monitor_multi_workers(duration: int = 1200):
     # CSV output
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     csv_file = f"multi_worker_usage_{timestamp}.csv"
-
-    metrics = []
+    csv_out = open(csv_file, "w", newline="")
+    writer = csv.writer(csv_out)
+    writer.writerow(CSV_FIELDS)
+
+    # Samples are flushed to the CSV in batches; only running totals are
+    # kept for the summary, so memory stays flat however long this runs
+    batch = []
+    samples = 0
+    sum_total_cpu = 0.0
+    sum_total_mem = 0.0
+    sum_worker_count = 0
+    sum_avg_cpu = 0.0
+    sum_avg_mem = 0.0
     start_time = time.time()
     peak_total_cpu = 0
     peak_total_mem = 0
     peak_worker_count = 0
+    last_scan = time.monotonic()
+    lost_worker = False
 
     try:
         while time.time() - start_time < duration:
-            # Rescan for workers (in case new ones started)
-            workers = find_worker_processes()
+            # Rescan for workers (in case new ones started) only now and then,
+            # or right after one died since it may have been restarted
+            if lost_worker or time.monotonic() - last_scan >= RESCAN_INTERVAL:
+                track_workers(workers)
+                last_scan = time.monotonic()
+                lost_worker = False
 
             if not workers:
                 print(f"\n⚠️  All workers have stopped")
                 break
 
-            # Collect metrics from all workers
-            worker_metrics = []
-            for proc in workers:
+            # Aggregate metrics from all workers as they are read, pruning
+            # any that exited
+            total_cpu = 0.0
+            total_mem = 0.0
+            worker_count = 0
+            for pid, proc in list(workers.items()):
                 try:
                     cpu = proc.cpu_percent(interval=0)
                     mem_mb = proc.memory_info().rss / 1024 / 1024
-                    worker_metrics.append({"cpu": cpu, "mem": mem_mb, "pid": proc.pid})
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    del workers[pid]
+                    lost_worker = True
                     continue
+                total_cpu += cpu
+                total_mem += mem_mb
+                worker_count += 1
 
-            if not worker_metrics:
+            if not worker_count:
                 continue
 
-            # Aggregate metrics
-            total_cpu = sum(w["cpu"] for w in worker_metrics)
-            total_mem = sum(w["mem"] for w in worker_metrics)
-            worker_count = len(worker_metrics)
             avg_cpu = total_cpu / worker_count
             avg_mem = total_mem / worker_count
 
@@ -94,17 +141,27 @@ def monitor_multi_workers(duration: int = 1200):
                 f"{timestamp_str:<20} {worker_count:<10} {total_cpu:<15.2f} {total_mem:<15.2f} {avg_cpu:<15.2f} {avg_mem:<15.2f}"
             )
 
-            metrics.append(
-                {
-                    "timestamp": timestamp_str,
-                    "worker_count": worker_count,
-                    "total_cpu_percent": round(total_cpu, 2),
-                    "total_memory_mb": round(total_mem, 2),
-                    "avg_cpu_percent": round(avg_cpu, 2),
-                    "avg_memory_mb": round(avg_mem, 2),
-                }
+            # Tuples in CSV_FIELDS order; no per-sample dict
+            batch.append(
+                (
+                    timestamp_str,
+                    worker_count,
+                    round(total_cpu, 2),
+                    round(total_mem, 2),
+                    round(avg_cpu, 2),
+                    round(avg_mem, 2),
+                )
             )
-
+            if len(batch) >= CSV_FLUSH_EVERY:
+                writer.writerows(batch)
+                batch.clear()
+
+            samples += 1
+            sum_total_cpu += total_cpu
+            sum_total_mem += total_mem
+            sum_worker_count += worker_count
+            sum_avg_cpu += avg_cpu
+            sum_avg_mem += avg_mem
             peak_total_cpu = max(peak_total_cpu, total_cpu)
             peak_total_mem = max(peak_total_mem, total_mem)
             peak_worker_count = max(peak_worker_count, worker_count)
@@ -114,46 +171,25 @@ def monitor_multi_workers(duration: int = 1200):
     except KeyboardInterrupt:
         print(f"\n\n⏹️  Monitoring stopped by user")
 
-    # Write CSV
-    if metrics:
-        with open(csv_file, "w", newline="") as f:
-            writer = csv.DictWriter(
-                f,
-                fieldnames=[
-                    "timestamp",
-                    "worker_count",
-                    "total_cpu_percent",
-                    "total_memory_mb",
-                    "avg_cpu_percent",
-                    "avg_memory_mb",
-                ],
-            )
-            writer.writeheader()
-            writer.writerows(metrics)
+    finally:
+        writer.writerows(batch)
+        csv_out.close()
 
+    if samples:
         print("\n" + "=" * 100)
         print(f"📊 MULTI-WORKER RESOURCE USAGE SUMMARY")
         print("=" * 100)
-        print(f"Duration: {len(metrics)} seconds ({len(metrics)/60:.1f} minutes)")
+        print(f"Duration: {samples} seconds ({samples/60:.1f} minutes)")
         print(f"Peak Worker Count: {peak_worker_count}")
         print(f"Peak Total CPU: {peak_total_cpu:.2f}%")
         print(f"Peak Total Memory: {peak_total_mem:.2f} MB")
 
-        if metrics:
-            avg_total_cpu = sum(m["total_cpu_percent"] for m in metrics) / len(metrics)
-            avg_total_mem = sum(m["total_memory_mb"] for m in metrics) / len(metrics)
-            avg_worker_count = sum(m["worker_count"] for m in metrics) / len(metrics)
-            avg_cpu_per_worker = sum(m["avg_cpu_percent"] for m in metrics) / len(
-                metrics
-            )
-            avg_mem_per_worker = sum(m["avg_memory_mb"] for m in metrics) / len(metrics)
-
-            print(f"\nAverage Worker Count: {avg_worker_count:.1f}")
-            print(f"Average Total CPU: {avg_total_cpu:.2f}%")
-            print(f"Average Total Memory: {avg_total_mem:.2f} MB")
-            print(f"\nPer-Worker Averages:")
-            print(f"  CPU: {avg_cpu_per_worker:.2f}%")
-            print(f"  Memory: {avg_mem_per_worker:.2f} MB")
+        print(f"\nAverage Worker Count: {sum_worker_count / samples:.1f}")
+        print(f"Average Total CPU: {sum_total_cpu / samples:.2f}%")
+        print(f"Average Total Memory: {sum_total_mem / samples:.2f} MB")
+        print(f"\nPer-Worker Averages:")
+        print(f"  CPU: {sum_avg_cpu / samples:.2f}%")
+        print(f"  Memory: {sum_avg_mem / samples:.2f} MB")
 
         print(f"\n💾 Data saved to: {csv_file}")
         print("=" * 100)
@@ -6,31 +6,32 @@ c = conn.cursor()
 
 domains = ['example.com', 'iana.org', 'python.org']
 
+# Every query below joins against this one list instead of repeating it
+c.execute('CREATE TEMP TABLE d(domain TEXT PRIMARY KEY)')
+c.executemany('INSERT INTO d VALUES (?)', [(domain,) for domain in domains])
+
 print('=== CONTACT INFORMATION ===')
-for domain in domains:
-    c.execute('SELECT domain, company_name, email, phone FROM contact_information WHERE domain = ?', (domain,))
-    rows = c.fetchall()
-    if rows:
-        for row in rows:
-            print(f"{domain}: {dict(row)}")
+c.execute('SELECT ci.domain, ci.company_name, ci.email, ci.phone FROM contact_information ci JOIN d ON d.domain = ci.domain ORDER BY d.rowid')
+for row in c.fetchall():
+    print(f"{row['domain']}: {dict(row)}")
 
 print('\n=== COMPANY INFORMATION ===')
-c.execute('SELECT * FROM company_information WHERE domain IN (?, ?, ?)', domains)
+c.execute('SELECT ci.* FROM company_information ci JOIN d ON d.domain = ci.domain')
 for row in c.fetchall():
     print(dict(row))
 
 print('\n=== DESCRIPTION & INDUSTRY ===')
-c.execute('SELECT domain, industry, sic_code FROM description_industry WHERE domain IN (?, ?, ?)', domains)
+c.execute('SELECT di.domain, di.industry, di.sic_code FROM description_industry di JOIN d ON d.domain = di.domain')
 for row in c.fetchall():
     print(dict(row))
 
 print('\n=== SERVICES ===')
-c.execute('SELECT domain, item_name FROM services WHERE domain IN (?, ?, ?)', domains)
+c.execute('SELECT s.domain, s.item_name FROM services s JOIN d ON d.domain = s.domain')
 for row in c.fetchall():
     print(dict(row))
 
 print('\n=== CERTIFICATIONS ===')
-c.execute('SELECT domain, certification FROM certifications WHERE domain IN (?, ?, ?)', domains)
+c.execute('SELECT ce.domain, ce.certification FROM certifications ce JOIN d ON d.domain = ce.domain')
 for row in c.fetchall():
     print(dict(row))
 
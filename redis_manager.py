@@ -4,7 +4,7 @@ Handles connection, job submission, and result retrieval.
 """
 
 import redis
-import json
+import orjson
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import uuid
@@ -13,6 +13,10 @@ import uuid
 class RedisQueueManager:
     """Manages Redis queues for domain processing jobs."""
 
+    MAX_CONNECTIONS = 128
+    # BLMOVE needs 6.2; UNLINK and multi-field HSET need 4.0
+    MIN_SERVER_VERSION = (6, 2)
+
     def __init__(self, host="localhost", port=6379, db=0):
         """
         Initialize Redis connection.
@@ -22,9 +26,16 @@ class RedisQueueManager:
             port: Redis server port
             db: Redis database number
         """
-        self.redis_client = redis.Redis(
-            host=host, port=port, db=db, decode_responses=True
+        # An explicit pool sized for many worker threads sharing one manager;
+        # redis-py drops pooled sockets in a forked child on its own
+        self.pool = redis.ConnectionPool(
+            host=host,
+            port=port,
+            db=db,
+            max_connections=self.MAX_CONNECTIONS,
+            decode_responses=False,
         )
+        self.redis_client = redis.Redis(connection_pool=self.pool)
 
         # Queue names
         self.PENDING_QUEUE = "domain:pending"
@@ -32,6 +43,13 @@ class RedisQueueManager:
         self.RESULTS_PREFIX = "result:"
         self.JOB_PREFIX = "job:"
         self.WORKER_PREFIX = "worker:"
+        self.LOGS_SUFFIX = ":logs"
+        self.LOG_COUNT_SUFFIX = ":log_count"
+        self.APPROVALS_SUFFIX = ":approvals"
+        self.DOMAINS_SUFFIX = ":domains"
+        self.MAX_JOB_LOGS = 2000
+        self.STATS_CACHE_KEY = "stats:v1"
+        self.STATS_CACHE_TTL = 10
 
     def ping(self) -> bool:
         """Check if Redis is available."""
@@ -40,47 +58,66 @@ class RedisQueueManager:
         except redis.ConnectionError:
             return False
 
-    def create_job(self, domains: List[str]) -> str:
+    def server_version(self) -> Optional[tuple]:
+        """(major, minor) of the connected server, or None if unknown."""
+        try:
+            version = self.redis_client.info("server")["redis_version"]
+            return tuple(int(part) for part in str(version).split(".")[:2])
+        except (redis.RedisError, KeyError, ValueError):
+            return None
+
+    def server_supported(self) -> bool:
+        """False only when the server reports a version that is too old."""
+        version = self.server_version()
+        return version is None or version >= self.MIN_SERVER_VERSION
+
+    def create_job(self, domains: List[str], require_approval: bool = False) -> str:
         """
         Create a new job for processing multiple domains.
 
         Args:
             domains: List of domain names to process
+            require_approval: Workers only extract; results wait for
+                resolve_approval instead of being saved immediately
 
         Returns:
             job_id: Unique identifier for this job
         """
         job_id = str(uuid.uuid4())
+        now = datetime.now().isoformat()
 
-        job_data = {
+        # Job state lives in a hash so results can bump its counters in
+        # place; timestamps are added as they happen (see _job_from_hash).
+        # The domain list never changes and is kept in its own key
+        job_fields = {
             "job_id": job_id,
-            "domains": domains,
             "total": len(domains),
             "completed": 0,
             "failed": 0,
-            "status": "pending",
-            "created_at": datetime.now().isoformat(),
-            "started_at": None,
-            "completed_at": None,
-            "metrics": {"start_time": None, "end_time": None, "domain_timings": {}},
-            "logs": [],
+            "require_approval": int(require_approval),
+            "created_at": now,
         }
 
-        # Store job metadata
-        self.redis_client.set(
-            f"{self.JOB_PREFIX}{job_id}",
-            json.dumps(job_data),
-            ex=86400,  # Expire after 24 hours
-        )
-
-        # Queue each domain for processing
-        for domain in domains:
-            task = {
+        # Store job metadata and queue every domain in one round-trip; the
+        # job is written first so no worker can pop a task without it.
+        # Every task shares the job's creation time as its queued_at
+        payloads = [
+            orjson.dumps({
                 "job_id": job_id,
                 "domain": domain,
-                "queued_at": datetime.now().isoformat(),
-            }
-            self.redis_client.rpush(self.PENDING_QUEUE, json.dumps(task))
+                "require_approval": require_approval,
+                "queued_at": now,
+            })
+            for domain in domains
+        ]
+        job_key = f"{self.JOB_PREFIX}{job_id}"
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hset(job_key, mapping=job_fields)
+        pipe.expire(job_key, 86400)  # Expire after 24 hours
+        pipe.set(f"{job_key}{self.DOMAINS_SUFFIX}", orjson.dumps(domains), ex=86400)
+        if payloads:
+            pipe.rpush(self.PENDING_QUEUE, *payloads)
+        pipe.execute()
 
         return job_id
 
@@ -95,24 +132,43 @@ class RedisQueueManager:
         Returns:
             Task dictionary or None if queue is empty
         """
-        # Block for up to 5 seconds waiting for a task
-        result = self.redis_client.blpop(self.PENDING_QUEUE, timeout=5)
+        # Block for up to 5 seconds waiting for a task. BLMOVE hands it to
+        # the processing queue atomically, so a worker dying mid-task leaves
+        # it there instead of losing it
+        task_json = self.redis_client.blmove(
+            self.PENDING_QUEUE, self.PROCESSING_QUEUE, 5, "LEFT", "RIGHT"
+        )
 
-        if result is None:
+        if task_json is None:
             return None
 
-        _, task_json = result
-        task = json.loads(task_json)
+        task = orjson.loads(task_json)
 
-        # Add worker info and move to processing queue
+        # Add worker info
         task["worker_id"] = worker_id
         task["started_at"] = datetime.now().isoformat()
 
         processing_key = f"processing:{worker_id}:{task['job_id']}:{task['domain']}"
-        self.redis_client.set(processing_key, json.dumps(task), ex=3600)
+        self.redis_client.set(processing_key, orjson.dumps(task), ex=3600)
 
+        # Keep the exact queued bytes for ack_task
+        task["payload"] = task_json
         return task
 
+    def ack_task(self, task: Dict[str, Any]):
+        """
+        Drop a finished task from the processing queue.
+
+        Args:
+            task: Task dictionary as returned by get_next_task
+        """
+        pipe = self.redis_client.pipeline()
+        pipe.lrem(self.PROCESSING_QUEUE, 1, task["payload"])
+        pipe.delete(
+            f"processing:{task['worker_id']}:{task['job_id']}:{task['domain']}"
+        )
+        pipe.execute()
+
     def submit_result(
         self,
         job_id: str,
@@ -120,6 +176,7 @@ class RedisQueueManager:
         success: bool,
         data: Optional[Dict] = None,
         error: Optional[str] = None,
+        pending_approval: bool = False,
     ):
         """
         Submit processing result for a domain.
@@ -130,46 +187,80 @@ class RedisQueueManager:
             success: Whether processing succeeded
             data: Extracted data (if successful)
             error: Error message (if failed)
+            pending_approval: Data is not saved yet; see resolve_approval
         """
+        now = datetime.now().isoformat()
         result = {
             "job_id": job_id,
             "domain": domain,
             "success": success,
-            "completed_at": datetime.now().isoformat(),
+            "completed_at": now,
             "data": data,
             "error": error,
+            "approval": "pending" if pending_approval else None,
         }
 
-        # Store result
+        # Store result and bump the job's counters in one MULTI; the first
+        # result stamps the start time, and HSETNX keeps it from moving
         result_key = f"{self.RESULTS_PREFIX}{job_id}:{domain}"
-        self.redis_client.set(result_key, json.dumps(result), ex=86400)
-
-        # Update job status
         job_key = f"{self.JOB_PREFIX}{job_id}"
-        job_json = self.redis_client.get(job_key)
-
-        if job_json:
-            job = json.loads(job_json)
-
-            if success:
-                job["completed"] += 1
-            else:
-                job["failed"] += 1
+        pipe = self.redis_client.pipeline()
+        pipe.set(result_key, orjson.dumps(result), ex=86400)
+        if pending_approval:
+            approvals_key = f"{self.JOB_PREFIX}{job_id}{self.APPROVALS_SUFFIX}"
+            pipe.hincrby(approvals_key, "pending", 1)
+            pipe.expire(approvals_key, 86400)
+        pipe.hincrby(job_key, "completed" if success else "failed", 1)
+        pipe.hsetnx(job_key, "started_at", now)
+        pipe.hmget(job_key, "total", "completed", "failed")
+        total, completed, failed = pipe.execute()[-1]
+
+        if total is None:
+            # The job had already expired; drop the hash HINCRBY recreated
+            self.redis_client.delete(job_key)
+        elif int(completed) + int(failed) >= int(total):
+            self.redis_client.hsetnx(job_key, "completed_at", now)
+
+    def resolve_approval(
+        self, job_id: str, domain: str, accepted: bool
+    ) -> Optional[Dict]:
+        """
+        Approve or reject a result that is waiting for approval.
 
-            # Update metrics
-            if job["metrics"]["start_time"] is None:
-                job["metrics"]["start_time"] = datetime.now().isoformat()
+        The check and the flip run as one WATCH/MULTI transaction that also
+        moves the job's approval counters, so concurrent requests for the
+        same domain resolve it exactly once.
 
-            # Check if all domains are processed
-            if job["completed"] + job["failed"] >= job["total"]:
-                job["status"] = "completed"
-                job["completed_at"] = datetime.now().isoformat()
-                job["metrics"]["end_time"] = datetime.now().isoformat()
-            elif job["status"] == "pending":
-                job["status"] = "processing"
-                job["started_at"] = datetime.now().isoformat()
+        Args:
+            job_id: Job identifier
+            domain: Domain whose result is being resolved
+            accepted: True to approve, False to reject
 
-            self.redis_client.set(job_key, json.dumps(job), ex=86400)
+        Returns:
+            The result's extracted data, or None if it was not pending
+        """
+        result_key = f"{self.RESULTS_PREFIX}{job_id}:{domain}"
+        approvals_key = f"{self.JOB_PREFIX}{job_id}{self.APPROVALS_SUFFIX}"
+
+        def resolve(pipe):
+            result_json = pipe.get(result_key)
+            if not result_json:
+                return None
+
+            result = orjson.loads(result_json)
+            if result.get("approval") != "pending":
+                return None
+
+            result["approval"] = "approved" if accepted else "rejected"
+            pipe.multi()
+            pipe.set(result_key, orjson.dumps(result), ex=86400)
+            pipe.hincrby(approvals_key, "pending", -1)
+            pipe.hincrby(approvals_key, result["approval"], 1)
+            return result["data"]
+
+        return self.redis_client.transaction(
+            resolve, result_key, value_from_callable=True
+        )
 
     def get_job_status(self, job_id: str) -> Optional[Dict]:
         """
@@ -182,25 +273,81 @@ class RedisQueueManager:
             Job status dictionary or None if not found
         """
         job_key = f"{self.JOB_PREFIX}{job_id}"
-        job_json = self.redis_client.get(job_key)
+        pipe = self.redis_client.pipeline()
+        pipe.hgetall(job_key)
+        pipe.get(f"{job_key}{self.DOMAINS_SUFFIX}")
+        fields, domains_json = pipe.execute()
 
-        if not job_json:
+        if not fields or not domains_json:
             return None
 
-        job = json.loads(job_json)
-
-        # Get results for completed domains
-        results = {}
-        for domain in job["domains"]:
-            result_key = f"{self.RESULTS_PREFIX}{job_id}:{domain}"
-            result_json = self.redis_client.get(result_key)
-            if result_json:
-                result = json.loads(result_json)
-                results[domain] = result
+        # Replies are raw bytes; only these few small fields need decoding
+        fields = {key.decode(): value.decode() for key, value in fields.items()}
+        job = self._job_from_hash(fields, orjson.loads(domains_json))
+        # Read the list and its running count together so log_count always
+        # describes exactly the entries returned
+        pipe = self.redis_client.pipeline()
+        pipe.lrange(f"{self.JOB_PREFIX}{job_id}{self.LOGS_SUFFIX}", 0, -1)
+        pipe.get(f"{self.JOB_PREFIX}{job_id}{self.LOG_COUNT_SUFFIX}")
+        pipe.hgetall(f"{self.JOB_PREFIX}{job_id}{self.APPROVALS_SUFFIX}")
+        # Results for completed domains come back in the same round-trip
+        result_keys = self._result_keys(job_id, job["domains"])
+        if result_keys:
+            pipe.mget(result_keys)
+        entries, log_count, approvals, *result_values = pipe.execute()
+        job["logs"] = [orjson.loads(entry) for entry in entries]
+        job["log_count"] = int(log_count) if log_count else len(entries)
+        job["approvals"] = {
+            state: int(approvals.get(state.encode(), 0))
+            for state in ("pending", "approved", "rejected")
+        }
 
-        job["results"] = results
+        values = result_values[0] if result_values else []
+        job["results"] = {
+            domain: orjson.loads(value)
+            for domain, value in zip(job["domains"], values)
+            if value
+        }
         return job
 
+    @staticmethod
+    def _job_from_hash(fields: Dict[str, str], domains: List[str]) -> Dict:
+        """Rebuild the job dictionary from its hash fields and domain list."""
+        total = int(fields["total"])
+        completed = int(fields.get("completed", 0))
+        failed = int(fields.get("failed", 0))
+        started_at = fields.get("started_at")
+        completed_at = fields.get("completed_at")
+
+        if completed + failed >= total:
+            status = "completed"
+        elif started_at:
+            status = "processing"
+        else:
+            status = "pending"
+
+        return {
+            "job_id": fields["job_id"],
+            "domains": domains,
+            "total": total,
+            "completed": completed,
+            "failed": failed,
+            "status": status,
+            "require_approval": fields.get("require_approval") == "1",
+            "created_at": fields.get("created_at"),
+            "started_at": started_at,
+            "completed_at": completed_at,
+            "metrics": {
+                "start_time": started_at,
+                "end_time": completed_at,
+                "domain_timings": {},
+            },
+        }
+
+    def _result_keys(self, job_id: str, domains: List[str]) -> List[str]:
+        """Result keys for each of a job's domains, in the same order."""
+        return [f"{self.RESULTS_PREFIX}{job_id}:{domain}" for domain in domains]
+
     def get_queue_size(self) -> int:
         """Get number of pending tasks in queue."""
         return self.redis_client.llen(self.PENDING_QUEUE)
@@ -224,28 +371,35 @@ class RedisQueueManager:
         """
         Add a log entry to the job.
 
+        Entries go to their own capped list, so concurrent workers don't
+        rewrite (and clobber) the job metadata for every log line. A running
+        count of every entry ever added lets readers number them even after
+        old ones are trimmed.
+
         Args:
             job_id: Job identifier
             level: Log level (info, success, warning, error)
             message: Log message
         """
-        job_key = f"{self.JOB_PREFIX}{job_id}"
-        job_json = self.redis_client.get(job_key)
-
-        if job_json:
-            job = json.loads(job_json)
-            
-            log_entry = {
-                "timestamp": datetime.now().strftime("%H:%M:%S"),
-                "level": level,
-                "message": message,
-            }
-            
-            if "logs" not in job:
-                job["logs"] = []
-            
-            job["logs"].append(log_entry)
-            self.redis_client.set(job_key, json.dumps(job), ex=86400)
+        pipe = self.redis_client.pipeline()
+        self._queue_log(pipe, job_id, level, message)
+        pipe.execute()
+
+    def _queue_log(self, pipe, job_id: str, level: str, message: str):
+        """Queue the commands for one add_log entry on a MULTI pipeline."""
+        log_entry = {
+            "timestamp": datetime.now().strftime("%H:%M:%S"),
+            "level": level,
+            "message": message,
+        }
+
+        logs_key = f"{self.JOB_PREFIX}{job_id}{self.LOGS_SUFFIX}"
+        count_key = f"{self.JOB_PREFIX}{job_id}{self.LOG_COUNT_SUFFIX}"
+        pipe.rpush(logs_key, orjson.dumps(log_entry))
+        pipe.ltrim(logs_key, -self.MAX_JOB_LOGS, -1)
+        pipe.incr(count_key)
+        pipe.expire(logs_key, 86400)
+        pipe.expire(count_key, 86400)
 
     def clear_job(self, job_id: str):
         """
@@ -254,16 +408,36 @@ class RedisQueueManager:
         Args:
             job_id: Job identifier
         """
-        job = self.get_job_status(job_id)
-        if not job:
+        domains_key = f"{self.JOB_PREFIX}{job_id}{self.DOMAINS_SUFFIX}"
+        domains_json = self.redis_client.get(domains_key)
+        if not domains_json:
             return
 
-        # Delete job metadata
-        self.redis_client.delete(f"{self.JOB_PREFIX}{job_id}")
+        # Job metadata, logs, counters and every result in one UNLINK; the
+        # memory is reclaimed in the background
+        self.redis_client.unlink(
+            f"{self.JOB_PREFIX}{job_id}",
+            f"{self.JOB_PREFIX}{job_id}{self.LOGS_SUFFIX}",
+            f"{self.JOB_PREFIX}{job_id}{self.LOG_COUNT_SUFFIX}",
+            f"{self.JOB_PREFIX}{job_id}{self.APPROVALS_SUFFIX}",
+            domains_key,
+            *self._result_keys(job_id, orjson.loads(domains_json)),
+        )
+
+    def get_cached_stats(self) -> Optional[Dict[str, int]]:
+        """Return the cached /api/stats payload, if still fresh."""
+        cached = self.redis_client.get(self.STATS_CACHE_KEY)
+        return orjson.loads(cached) if cached else None
+
+    def cache_stats(self, stats: Dict[str, int]):
+        """Cache the /api/stats payload for STATS_CACHE_TTL seconds."""
+        self.redis_client.set(
+            self.STATS_CACHE_KEY, orjson.dumps(stats), ex=self.STATS_CACHE_TTL
+        )
 
-        # Delete all results
-        for domain in job["domains"]:
-            self.redis_client.delete(f"{self.RESULTS_PREFIX}{job_id}:{domain}")
+    def invalidate_stats(self):
+        """Drop cached stats after new rows are written."""
+        self.redis_client.delete(self.STATS_CACHE_KEY)
 
     def get_worker_stats(self) -> Dict[str, int]:
         """Get statistics about queue and workers."""
@@ -280,6 +454,41 @@ class RedisQueueManager:
             progress: Progress percentage (0-100)
             status: Worker status (idle, processing, complete)
         """
+        self._set_worker_status(
+            self.redis_client, job_id, worker_id, domain, progress, status
+        )
+
+    def update_and_log(
+        self,
+        job_id: str,
+        worker_id: str,
+        domain: Optional[str],
+        progress: int,
+        status: str,
+        level: str,
+        message: str,
+    ):
+        """
+        update_worker_status followed by add_log, in a single round-trip.
+
+        Args:
+            job_id: Job identifier
+            worker_id: Worker identifier
+            domain: Current domain being processed
+            progress: Progress percentage (0-100)
+            status: Worker status (idle, processing, complete)
+            level: Log level (info, success, warning, error)
+            message: Log message
+        """
+        pipe = self.redis_client.pipeline()
+        self._set_worker_status(pipe, job_id, worker_id, domain, progress, status)
+        self._queue_log(pipe, job_id, level, message)
+        pipe.execute()
+
+    def _set_worker_status(
+        self, client, job_id: str, worker_id: str, domain, progress: int, status: str
+    ):
+        """Write a worker's status record through a client or pipeline."""
         worker_data = {
             "worker_id": worker_id,
             "job_id": job_id,
@@ -290,7 +499,7 @@ class RedisQueueManager:
         }
         
         worker_key = f"{self.WORKER_PREFIX}{job_id}:{worker_id}"
-        self.redis_client.set(worker_key, json.dumps(worker_data), ex=3600)
+        client.set(worker_key, orjson.dumps(worker_data), ex=3600)
 
     def get_workers_for_job(self, job_id: str) -> List[Dict]:
         """
@@ -309,7 +518,7 @@ class RedisQueueManager:
         for key in worker_keys:
             worker_json = self.redis_client.get(key)
             if worker_json:
-                workers.append(json.loads(worker_json))
+                workers.append(orjson.loads(worker_json))
         
         return workers
 
@@ -44,8 +44,12 @@ class DomainWorker:
                     # No tasks available, check if we should keep waiting
                     continue
 
-                # Process the domain
-                self.process_task(task)
+                # Process the domain; it leaves the processing queue only
+                # once a result has been submitted
+                try:
+                    self.process_task(task)
+                finally:
+                    self.redis.ack_task(task)
 
             except KeyboardInterrupt:
                 print(f"\n[{self.worker_id}] Shutting down gracefully...")
@@ -64,35 +68,62 @@ class DomainWorker:
         """
         job_id = task["job_id"]
         domain = task["domain"]
+        require_approval = task.get("require_approval", False)
 
         print(f"[{self.worker_id}] 🔍 Processing {domain} (Job: {job_id[:8]}...)")
         
         # Update worker status - processing started
-        self.redis.update_worker_status(job_id, self.worker_id, domain, 10, "processing")
-        self.redis.add_log(job_id, "info", f"🔍 Worker {self.worker_id} started processing {domain}")
+        self.redis.update_and_log(
+            job_id, self.worker_id, domain, 10, "processing",
+            "info", f"🔍 Worker {self.worker_id} started processing {domain}",
+        )
 
         start_time = time.time()
 
         try:
             # Process domain using agent graph
-            self.redis.update_worker_status(job_id, self.worker_id, domain, 30, "processing")
-            self.redis.add_log(job_id, "info", f"📝 Extracting profile from {domain}...")
-            result = process_domain(domain)
+            self.redis.update_and_log(
+                job_id, self.worker_id, domain, 30, "processing",
+                "info", f"📝 Extracting profile from {domain}...",
+            )
+            result = process_domain(domain, skip_save=require_approval)
             
             self.redis.update_worker_status(job_id, self.worker_id, domain, 70, "processing")
 
             duration = time.time() - start_time
 
             status = result.get("status") if result else None
-            failed = (status is None) or status.endswith("failed")
+            failed = (
+                (status is None) or status.endswith("failed") or status == "too_short"
+            )
 
             if result and not failed:
                 # Success - submit result to Redis
                 print(
                     f"[{self.worker_id}] ✅ Extracted {domain} in {duration:.1f}s (status={status})"
                 )
-                self.redis.update_worker_status(job_id, self.worker_id, domain, 90, "processing")
-                self.redis.add_log(job_id, "success", f"✅ {domain} processed successfully in {duration:.2f}s")
+
+                if require_approval:
+                    # Leave saving to /api/accept_extracted
+                    self.redis.update_and_log(
+                        job_id, self.worker_id, domain, 90, "processing",
+                        "info", f"⏳ {domain} extracted - queued for approval",
+                    )
+                    self.redis.submit_result(
+                        job_id=job_id,
+                        domain=domain,
+                        success=True,
+                        data=result.get("extracted_data"),
+                        pending_approval=True,
+                    )
+                    self.redis.update_worker_status(job_id, self.worker_id, None, 0, "idle")
+                    self.processed_count += 1
+                    return
+
+                self.redis.update_and_log(
+                    job_id, self.worker_id, domain, 90, "processing",
+                    "success", f"✅ {domain} processed successfully in {duration:.2f}s",
+                )
 
                 self.redis.submit_result(
                     job_id=job_id, domain=domain, success=True, data=result
@@ -101,12 +132,17 @@ class DomainWorker:
                 # Also save to database immediately (auto-approval for Redis workers)
                 try:
                     save_extracted_data(domain, result)
-                    self.redis.update_worker_status(job_id, self.worker_id, domain, 100, "complete")
-                    self.redis.add_log(job_id, "info", f"💾 Saved {domain} to database")
+                    self.redis.invalidate_stats()
+                    self.redis.update_and_log(
+                        job_id, self.worker_id, domain, 100, "complete",
+                        "info", f"💾 Saved {domain} to database",
+                    )
                     print(f"[{self.worker_id}] 💾 Saved {domain} to database")
                 except Exception as db_error:
-                    self.redis.update_worker_status(job_id, self.worker_id, domain, 100, "complete")
-                    self.redis.add_log(job_id, "warning", f"⚠️ DB save failed for {domain}: {str(db_error)[:100]}")
+                    self.redis.update_and_log(
+                        job_id, self.worker_id, domain, 100, "complete",
+                        "warning", f"⚠️ DB save failed for {domain}: {str(db_error)[:100]}",
+                    )
                     print(
                         f"[{self.worker_id}] ⚠️ DB save failed for {domain}: {db_error}"
                     )
@@ -121,8 +157,10 @@ class DomainWorker:
                 if not error_msg and status:
                     error_msg = f"Status {status}"
                 print(f"[{self.worker_id}] ❌ Failed {domain}: {error_msg}")
-                self.redis.update_worker_status(job_id, self.worker_id, domain, 100, "error")
-                self.redis.add_log(job_id, "error", f"❌ {domain} failed: {error_msg[:100]}")
+                self.redis.update_and_log(
+                    job_id, self.worker_id, domain, 100, "error",
+                    "error", f"❌ {domain} failed: {error_msg[:100]}",
+                )
 
                 self.redis.submit_result(
                     job_id=job_id, domain=domain, success=False, error=error_msg
@@ -134,8 +172,10 @@ class DomainWorker:
             duration = time.time() - start_time
             error_msg = str(e)
             print(f"[{self.worker_id}] ❌ Exception processing {domain}: {error_msg}")
-            self.redis.update_worker_status(job_id, self.worker_id, domain, 100, "error")
-            self.redis.add_log(job_id, "error", f"❌ Exception: {error_msg[:100]}")
+            self.redis.update_and_log(
+                job_id, self.worker_id, domain, 100, "error",
+                "error", f"❌ Exception: {error_msg[:100]}",
+            )
 
             self.redis.submit_result(
                 job_id=job_id, domain=domain, success=False, error=error_msg
@@ -161,11 +201,13 @@ def main():
     redis = get_redis_manager()
     if not redis.ping():
         print("ERROR: Cannot connect to Redis. Make sure Redis is running.")
-        print(
-            "  Windows: Install Redis from https://github.com/microsoftarchive/redis/releases"
-        )
+        print("  Windows: use Memurai, Redis under WSL, or Docker (see REDIS_SETUP.md)")
         print("  Or use Docker: docker run -d -p 6379:6379 redis:latest")
         sys.exit(1)
+    if not redis.server_supported():
+        minimum = ".".join(map(str, redis.MIN_SERVER_VERSION))
+        print(f"ERROR: Redis {redis.server_version()} is too old; {minimum}+ is required.")
+        sys.exit(1)
 
     print("✓ Connected to Redis")
 
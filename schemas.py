@@ -1,5 +1,5 @@
 from typing import List, Optional
-from pydantic import BaseModel, HttpUrl, Field
+from pydantic import BaseModel, Field
 
 
 class EnqueueRequest(BaseModel):
@@ -27,7 +27,7 @@ class CompanyProfile(BaseModel):
     key_people: List[dict] = []
     contacts: List[dict] = []
     tech_stack: List[str] = []
-    logo_url: Optional[HttpUrl] = None
+    logo_url: Optional[str] = None
 
 
 class CompanyResponse(BaseModel):
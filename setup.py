@@ -3,47 +3,48 @@ Setup script for Agent environment
 Creates virtual environment and installs dependencies
 """
 
+import shutil
 import subprocess
 import sys
 from pathlib import Path
 
 
-def run_command(cmd, shell=True):
-    """Run a command and print output"""
-    print(f"\n>>> {cmd}")
-    result = subprocess.run(cmd, shell=shell, capture_output=True, text=True)
-    if result.stdout:
-        print(result.stdout)
-    if result.returncode != 0 and result.stderr:
-        print(f"Error: {result.stderr}")
-        return False
-    return True
+def run_command(cmd):
+    """Run a command, streaming its output; return True on success"""
+    print(f"\n>>> {subprocess.list2cmdline(cmd)}")
+    return subprocess.run(cmd).returncode == 0
 
 
 def main():
     base_path = Path(__file__).parent
+    env_path = base_path / "agent_env"
+    python_path = env_path / "Scripts" / "python.exe"
+    req_path = base_path / "requirements.txt"
+    # uv resolves and downloads wheels in parallel from a shared cache;
+    # plain venv + pip is the fallback when it isn't installed
+    uv = shutil.which("uv")
 
     print("=" * 60)
     print("AGENT ENVIRONMENT SETUP")
     print("=" * 60)
 
     # Step 1: Create virtual environment
-    print("\n[1/3] Creating virtual environment 'agent_env'...")
-    if not run_command(f"python -m venv {base_path / 'agent_env'}"):
+    print("\n[1/2] Creating virtual environment 'agent_env'...")
+    if uv:
+        created = run_command([uv, "venv", str(env_path)])
+    else:
+        created = run_command([sys.executable, "-m", "venv", str(env_path)])
+    if not created:
         print("Failed to create virtual environment")
         return
 
-    # Step 2: Upgrade pip
-    print("\n[2/3] Upgrading pip...")
-    pip_path = base_path / "agent_env" / "Scripts" / "pip.exe"
-    if not run_command(f'"{pip_path}" install --upgrade pip'):
-        print("Failed to upgrade pip")
-        return
-
-    # Step 3: Install requirements
-    print("\n[3/3] Installing dependencies...")
-    req_path = base_path / "requirements.txt"
-    if not run_command(f'"{pip_path}" install -r "{req_path}"'):
+    # Step 2: Install requirements
+    print("\n[2/2] Installing dependencies...")
+    if uv:
+        cmd = [uv, "pip", "install", "-r", str(req_path), "--python", str(python_path)]
+    else:
+        cmd = [str(python_path), "-m", "pip", "install", "-r", str(req_path)]
+    if not run_command(cmd):
         print("Failed to install requirements")
         return
 
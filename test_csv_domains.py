@@ -0,0 +1,26 @@
+import pytest
+
+api_server = pytest.importorskip("api_server")
+
+
+RAGGED_CSVS = [
+    # Trailing comma and an extra column after an unquoted one-field row
+    ("a.com\nb.com,\nc.com,x,y\nd.com\n", ["a.com", "b.com", "c.com", "d.com"]),
+    # Header row names the column; later rows are wider than the header
+    (
+        "name,domain\nA,a.com\nB,b.com,extra,more\nC,c.com,\n",
+        ["a.com", "b.com", "c.com"],
+    ),
+    # Short rows have no domain field and are skipped
+    ("domain,name\na.com,A\nb.com,B,extra\n\nc.com\n", ["a.com", "b.com", "c.com"]),
+]
+
+
+@pytest.mark.parametrize("text,expected", RAGGED_CSVS)
+def test_ragged_rows_keep_their_domains(text, expected):
+    assert api_server._read_csv_domains(text.encode()) == expected
+
+
+@pytest.mark.parametrize("text,expected", RAGGED_CSVS)
+def test_matches_csv_module_reader(text, expected):
+    assert api_server._read_csv_domains_py(text) == expected
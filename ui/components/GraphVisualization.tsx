@@ -89,8 +89,7 @@ export default function GraphVisualization() {
                   <div className="font-medium text-gray-800">{node.label}</div>
                   <div className="text-sm text-gray-600">
                     {node.id === "scrape" &&
-                      "HTTP request + BeautifulSoup parsing"}
-                    {node.id === "preprocess" && "Text cleaning & normalization"}
+                      "HTTP request + HTML parsing, text cleaning & normalization"}
                     {node.id === "extract" &&
                       "Ollama llama3.2:3b with structured JSON"}
                     {node.id === "save" && "SQLite storage (7 tables)"}